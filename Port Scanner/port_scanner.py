@@ -1,5 +1,22 @@
+import argparse
+import asyncio
+import bisect
+import csv
+import errno
+import heapq
+import ipaddress
+import json
+import os
+import queue
+import re
+import selectors
 import socket
 import sys
+import time
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+import threading
 from datetime import datetime
 
 # --- Function to Get Local IP Address ---
@@ -26,15 +43,20 @@ def get_local_ip():
 # --- Configuration Section ---
 # This is where you can tell the script what to scan.
 
-# By default, the script will scan your own computer's local IP address.
-# This is usually a safe way to test it out.
-TARGET_HOST = get_local_ip()
+# By default (None), the script will scan your own computer's local IP address.
+# This is usually a safe way to test it out. The address is only looked up when a scan starts,
+# so simply importing this file never touches the network.
+TARGET_HOST = None
 
 # If you want to scan a different computer, uncomment the line below and change the IP address or hostname.
 # Remember: Only scan computers you own or have explicit permission to scan!
 # TARGET_HOST = "192.168.1.1" # Example: your home router
 # TARGET_HOST = "example.com" # Example: a website (if you have permission)
 
+# You can also scan many computers at once by passing targets on the command line:
+# single addresses, hostnames, whole networks written as CIDR (e.g. 10.0.0.0/24),
+# or a file with one target per line (-iL targets.txt).
+
 # These are the specific network ports that the script will check.
 # Each port is commonly used by a specific service or application.
 PORTS_TO_SCAN = [
@@ -55,6 +77,78 @@ PORTS_TO_SCAN = [
     3389  # RDP (Remote Desktop Protocol - for remote desktop access)
 ]
 
+# How many connection attempts are allowed to be "in flight" at the same time.
+# Instead of waiting for each port one after another, the scanner keeps up to this many
+# attempts running together, so a slow or filtered port no longer holds up all the others.
+MAX_CONCURRENT_CONNECTIONS = 500
+
+# How long (in seconds) to wait for a single connection attempt before giving up on it.
+CONNECT_TIMEOUT = 1.0
+
+# When scanning with several worker processes (-w), the work is cut into this many pieces per worker.
+# Smaller pieces keep every CPU core busy until the end and let results arrive more often.
+SHARDS_PER_WORKER = 8
+
+# With --checkpoint, the progress of the scan is saved to disk every this many seconds,
+# so an interrupted scan can continue where it stopped instead of starting over.
+CHECKPOINT_INTERVAL = 30
+
+# Hostnames are looked up by this many threads at once, so a long list of names doesn't
+# have to be resolved one after the other before the scan can start.
+RESOLVE_WORKERS = 32
+
+# Resolved names are remembered for this many seconds (and names that failed for DNS_NEGATIVE_TTL),
+# so scanning the same targets again, or a name listed twice, doesn't ask the DNS server again.
+DNS_CACHE_TTL = 300
+DNS_NEGATIVE_TTL = 60
+
+# Pacing: the concurrent engines don't fire at full speed blindly. They start with a small
+# "window" of connection attempts in flight and grow it while the network keeps up (like TCP does),
+# and cut it in half when timeouts suddenly spike or the system runs out of sockets.
+# --concurrency is the largest the window can ever get.
+INITIAL_WINDOW = 32
+MIN_WINDOW = 4
+# Timeouts count as a "spike" when their share of recent results is at least this many times
+# the usual share, and at least MIN_DROP_SPIKE (so a few stray timeouts don't slow us down).
+DROP_SPIKE_FACTOR = 2.0
+MIN_DROP_SPIKE = 0.05
+
+# Errors that mean our own computer is overloaded (no free sockets, buffers or outgoing ports),
+# not that the port is closed. Probes that hit them are tried again later.
+LOCAL_RESOURCE_ERRORS = (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL)
+
+# Limits for the adaptive timeout used by the non-blocking ("epoll") engine.
+# The engine measures how fast the target answers and sets its timeout from that,
+# but never below MIN_ADAPTIVE_TIMEOUT or above MAX_ADAPTIVE_TIMEOUT seconds.
+MIN_ADAPTIVE_TIMEOUT = 0.05
+MAX_ADAPTIVE_TIMEOUT = 5.0
+
+# How many extra tries a port gets when it doesn't answer before the timeout.
+# Adaptive timeouts can be tight, so one retry (with double the timeout) protects accuracy.
+MAX_RETRIES = 1
+
+# The three possible results of a port check.
+# "open" means something answered, "closed" means the host refused the connection,
+# and "filtered" means nobody answered before the timeout (often a firewall dropping packets).
+PORT_OPEN = "open"
+PORT_CLOSED = "closed"
+PORT_FILTERED = "filtered"
+
+# Instead of the list above, you can pass your own ports with -p / --ports, for example:
+#   -p 1-1024,3306,8000-9000     (ranges and single ports, separated by commas)
+#   -p top100                    (the 100 most commonly open ports, see TOP_PORTS below)
+#   -p 1-65535                   (every port)
+
+# The 100 TCP ports most often found open on the internet (the same set nmap uses for its "fast" scan),
+# roughly ordered from most to least common. "topN" in a port spec takes the first N of them.
+TOP_PORTS = [
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900,
+    1025, 587, 8888, 199, 1720, 465, 548, 113, 81, 6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554,
+    26, 1433, 49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153, 8081, 2049, 88, 79, 5800, 106,
+    2121, 1110, 49155, 6000, 513, 990, 5357, 427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009,
+    7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028, 873, 1755, 2717, 4899, 9100, 119, 37
+]
+
 # This dictionary helps the script give you a readable name for each port.
 # If a port is open, it tells you what service usually runs on it.
 COMMON_SERVICES = {
@@ -75,13 +169,93 @@ COMMON_SERVICES = {
     3389: "RDP (Remote Desktop Protocol)"
 }
 
+# --- Service Fingerprinting Settings ---
+# With --fingerprint, every open port is also asked "what are you?" to find the real service,
+# even when it runs on an unusual port. This happens in a separate stage, so it never holds up the scan.
+FINGERPRINT_CONCURRENCY = 100 # How many open ports can be fingerprinted at the same time.
+BANNER_TIMEOUT = 1.0 # Seconds to wait for a service to greet us (or to answer our probe).
+BANNER_MAX_BYTES = 1024 # We only need the first bytes of the answer to recognize a service.
+
+# The probe we send when a service doesn't talk first. Most "silent" services are web servers,
+# and a HEAD request gets a short answer from them without downloading a page.
+HTTP_PROBE = b"HEAD / HTTP/1.0\r\n\r\n"
+
+# Signatures used to recognize services from their first bytes.
+# Each entry is (service name, pattern, number of the group holding the version or None).
+# They are compiled once, when the script starts, and tried in order.
+SERVICE_SIGNATURES = [
+    (name, re.compile(pattern, re.DOTALL), version_group)
+    for name, pattern, version_group in [
+        ("SSH", rb"^SSH-[\d.]+-([^\s]+)", 1),
+        ("SMTP", rb"^220[ -]([^\r\n]*\b(?:E?SMTP|Postfix|Exim|Sendmail)\b[^\r\n]*)", 1),
+        ("FTP", rb"^220[ -]([^\r\n]*FTP[^\r\n]*)", 1),
+        ("POP3", rb"^\+OK ?([^\r\n]*)", 1),
+        ("IMAP", rb"^\* OK ?([^\r\n]*)", 1),
+        ("MySQL", rb"^.{4}\x0a(\d[\w.\-~+]*)\x00", 1),
+        ("VNC", rb"^RFB (\d{3}\.\d{3})", 1),
+        ("Telnet", rb"^\xff[\xfb-\xfe]", None),
+        ("Redis", rb"^-(?:ERR|NOAUTH|DENIED)", None),
+        ("HTTP", rb"^HTTP/\d\.\d \d{3}.*?(?:\r\nServer: *([^\r\n]+)|\r\n\r\n|$)", 1),
+    ]
+]
+
+# --- UDP Scan Settings ---
+# UDP services usually ignore empty packets, so for the well-known ones we send a small, valid request
+# that makes them answer. Any other port gets an empty packet.
+UDP_PAYLOADS = {
+    # DNS: a standard query for the root name servers.
+    53: b"\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x01",
+    # TFTP: a read request for a file; a server answers even if the file doesn't exist.
+    69: b"\x00\x01scan.txt\x00octet\x00",
+    # NTP: a version 3 client request.
+    123: b"\x1b" + b"\x00" * 47,
+    # SNMP: a version 1 GetRequest for sysDescr.0 with the "public" community.
+    161: bytes.fromhex("302902010004067075626c6963a01c020471b4b568020100020100300e300c06082b060102010101000500"),
+}
+UDP_RETRIES = 2 # How many times a probe is sent again when no answer arrives (UDP packets can simply get lost).
+UDP_MAX_REPLY = 2048
+
+# --- Port Specifications ---
+def parse_port_spec(spec):
+    """
+    Turns a port specification like "1-1024,3306,8000-9000,top100" into a sorted list of port numbers.
+    Each comma-separated part can be a single port, a range "start-end", or "topN".
+    Ports that appear more than once are only scanned once.
+    Raises ValueError with a readable message if the specification is invalid.
+    """
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part.startswith("top"):
+            count = int(part[3:]) if part[3:].isdigit() else 0
+            if not 1 <= count <= len(TOP_PORTS):
+                raise ValueError(f"'{part}' is not valid: use top1 to top{len(TOP_PORTS)}.")
+            ports.update(TOP_PORTS[:count])
+            continue
+        start, _, end = part.partition("-")
+        try:
+            first, last = int(start), int(end or start)
+        except ValueError:
+            raise ValueError(f"'{part}' is not a port number or range.") from None
+        if not 1 <= first <= last <= 65535:
+            raise ValueError(f"'{part}' is outside the valid port range 1-65535.")
+        ports.update(range(first, last + 1))
+    if not ports:
+        raise ValueError("No ports were given.")
+    return sorted(ports)
+
 # --- Port Scanning Logic ---
 def scan_port(host, port):
     """
     This function checks if a single network "door" (port) is open on a specific computer (host).
     It tries to connect to the port.
     If the connection is successful, it means the port is "open" and a service is likely listening there.
+    Returns the state of the port ("open", "closed" or "filtered").
+    Raises socket.gaierror if the host name can't be resolved.
     """
+    state = PORT_CLOSED
     try:
         # Create a special connection object (socket) to try and connect
         # It's like dialing a phone number for a specific service.
@@ -96,39 +270,1638 @@ def scan_port(host, port):
             # Look up the common service name for this open port
             service = COMMON_SERVICES.get(port, "Unknown Service")
             print(f"Port {port} is OPEN: {service}")
+            state = PORT_OPEN
+        elif result in (errno.EAGAIN, errno.EWOULDBLOCK, errno.ETIMEDOUT):
+            state = PORT_FILTERED # Nobody answered within the timeout.
         s.close() # Always close the connection attempt, whether it was open or not
     except socket.gaierror:
         # This error means the computer name or IP address you gave wasn't recognized.
-        print(f"Error: Couldn't resolve hostname for {host}. Please check the address.")
-        sys.exit() # Stop the script if the host can't be found
+        # We let the caller decide what to do, instead of stopping the whole program here.
+        raise
     except socket.error as e:
         # This catches other general connection errors.
         # We only print them if they're not a common "Connection refused" error on localhost,
         # which just means the port is closed.
         if host != "127.0.0.1" or "Connection refused" not in str(e):
              print(f"Connection Error on port {port} on {host}: {e}")
+    return state
+
+# --- Pacing and Congestion Control ---
+class TokenBucket:
+    """
+    Limits how many probes per second can be sent.
+    The bucket fills up with 'rate' tokens per second (up to 'burst' tokens) and every probe uses one.
+    When it's empty, the next probe has to wait for a token to drip in.
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate / 10) # By default, allow bursts of 1/10 of a second of traffic.
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, now):
+        """Returns 0 if a token is available right now, otherwise how many seconds until there is one."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+class AimdWindow:
+    """
+    Decides how many connection attempts may be in flight, the way TCP congestion control does.
+    While everything goes well the window grows: quickly at first (by one for every answer, "slow start"),
+    then slowly (by about one per full window of answers). When timeouts spike compared to what
+    is usual for this scan, or the system runs out of sockets, the window is cut in half
+    ("additive increase, multiplicative decrease").
+    Timeouts are judged in rounds of about one window of results: a host that always drops
+    packets raises the usual timeout rate instead of slowing the scan down forever.
+    """
+    def __init__(self, max_window, initial_window=INITIAL_WINDOW, min_window=MIN_WINDOW):
+        self.max_window = max_window
+        self.min_window = min(min_window, max_window)
+        self.window = float(min(initial_window, max_window))
+        self.slow_start_limit = float(max_window)
+        self.round_answers = 0
+        self.round_drops = 0
+        self.usual_drop_rate = None
+
+    def allows(self, in_flight):
+        """Tells whether another connection attempt can be started."""
+        return in_flight < int(self.window)
+
+    def on_answer(self):
+        """The host answered (open or refused): the network delivered our probe, so grow the window."""
+        self.round_answers += 1
+        if self.window < self.slow_start_limit:
+            self.window += 1
+        else:
+            self.window += 1 / self.window
+        self.window = min(self.window, self.max_window)
+        self._end_round_if_due()
+
+    def on_drop(self):
+        """A probe got no answer before its timeout."""
+        self.round_drops += 1
+        self._end_round_if_due()
+
+    def on_resource_error(self):
+        """Our own system ran out of sockets or buffers: back off right away."""
+        self._decrease()
+
+    def _decrease(self):
+        self.slow_start_limit = max(self.min_window, self.window / 2)
+        self.window = self.slow_start_limit
+
+    def _end_round_if_due(self):
+        total = self.round_answers + self.round_drops
+        if total < self.window:
+            return
+        drop_rate = self.round_drops / total
+        usual = self.usual_drop_rate
+        if usual is not None and drop_rate >= max(MIN_DROP_SPIKE, usual * DROP_SPIKE_FACTOR):
+            self._decrease()
+        self.usual_drop_rate = drop_rate if usual is None else 0.8 * usual + 0.2 * drop_rate
+        self.round_answers = self.round_drops = 0
+
+class Pacer:
+    """
+    Combines everything that decides when the next probe may start:
+    the congestion window (AimdWindow), an optional overall probes-per-second limit,
+    and an optional probes-per-second limit for each single host.
+    """
+    def __init__(self, max_window, rate=None, host_rate=None):
+        self.window = AimdWindow(max_window)
+        self.bucket = TokenBucket(rate) if rate else None
+        self.host_rate = host_rate
+        self.host_buckets = {} # host -> TokenBucket, created the first time a host is probed
+
+    def rate_wait(self, host, now):
+        """
+        Returns 0 and uses up the tokens if a probe to 'host' may start now,
+        otherwise returns how many seconds to wait before asking again.
+        """
+        buckets = [self.bucket] if self.bucket else []
+        if self.host_rate:
+            if host not in self.host_buckets:
+                self.host_buckets[host] = TokenBucket(self.host_rate)
+            buckets.append(self.host_buckets[host])
+        wait = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+        if wait == 0:
+            for bucket in buckets:
+                bucket.take()
+        return wait
+
+# --- Concurrent (asyncio) Scan Engine ---
+def is_self_connection(sock):
+    """
+    When scanning our own machine, the system can pick the very port we're probing as the
+    outgoing port and "connect" the socket to itself. That isn't a real service, so we check for it.
+    """
+    try:
+        return sock.getsockname() == sock.getpeername()
+    except OSError:
+        return False
+
+async def async_check_port(host, port, timeout=CONNECT_TIMEOUT, on_open=None):
+    """
+    Checks a single port without blocking the rest of the program.
+    It follows the same rule as connect_ex(): if the connection succeeds the port is open,
+    if the host refuses it the port is closed, and if nothing answers in time it is filtered.
+    Returns a (host, port, state) tuple.
+
+    If on_open is given, an open connection isn't closed here: instead it is passed to
+    on_open(host, port, reader, writer) (e.g. ServiceFingerprinter.start(), to grab a banner), which may
+    wait until the next stage has room and returns the background task handling the connection.
+    That task is returned as a fourth item so the caller can wait for it later.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        return host, port, PORT_FILTERED
+    except OSError as e:
+        if e.errno in LOCAL_RESOURCE_ERRORS:
+            raise # Our own problem, not an answer from the host: the caller will try again later.
+        # Connection refused, host unreachable and similar errors all mean "not open",
+        # exactly like a non-zero return value from connect_ex().
+        return host, port, PORT_CLOSED
+
+    sock = writer.get_extra_info("socket")
+    state = PORT_CLOSED if sock is not None and is_self_connection(sock) else PORT_OPEN
+    if state == PORT_OPEN and on_open is not None:
+        # Hand the live connection to the next stage and move on as soon as it has taken it.
+        return host, port, state, await on_open(host, port, reader, writer)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass # The port was open; an error while hanging up doesn't change that.
+    return host, port, state
+
+async def scan_probes_async(probes, max_concurrency=MAX_CONCURRENT_CONNECTIONS, timeout=CONNECT_TIMEOUT, on_open=None, pacer=None):
+    """
+    Scans many (host, port) pairs at once and hands back each result as soon as it is known.
+    A fixed number of "workers" (max_concurrency) share the list of probes: each worker takes
+    the next one, checks it and moves on. This keeps at most max_concurrency connection
+    attempts in flight, no matter how many probes there are to run.
+    With a Pacer, fewer attempts may be in flight (its congestion window) and probes wait for its rate limits.
+    Open connections can be passed on to a second stage with on_open (see async_check_port());
+    the scan only ends once those background tasks have finished too. While on_open waits for room
+    (as ServiceFingerprinter.start() does), the worker waits with it, so the scan slows down to the second stage's pace.
+    This is an async generator: use it with 'async for host, port, state in scan_probes_async(...)'.
+    """
+    probe_iter = iter(probes)
+    results = asyncio.Queue()
+    handoffs = set() # Background tasks from on_open that are still running.
+    in_flight = 0
+    slot_freed = asyncio.Condition() # Wakes up workers waiting for room in the pacer's window.
+
+    async def check(host, port):
+        nonlocal in_flight
+        if pacer is None:
+            return await async_check_port(host, port, timeout, on_open)
+        async with slot_freed:
+            await slot_freed.wait_for(lambda: pacer.window.allows(in_flight))
+            in_flight += 1
+        try:
+            wait = pacer.rate_wait(host, time.monotonic())
+            while wait:
+                await asyncio.sleep(wait)
+                wait = pacer.rate_wait(host, time.monotonic())
+            result = await async_check_port(host, port, timeout, on_open)
+            if result[2] == PORT_FILTERED:
+                pacer.window.on_drop()
+            else:
+                pacer.window.on_answer()
+            return result
+        finally:
+            in_flight -= 1
+            async with slot_freed:
+                slot_freed.notify_all()
+
+    async def worker():
+        # Probes are handed out one at a time, so workers never check the same port twice.
+        try:
+            for host, port in probe_iter:
+                while True:
+                    try:
+                        host, port, state, *handoff = await check(host, port)
+                        break
+                    except OSError:
+                        # Out of sockets: slow down and try the same probe again shortly.
+                        if pacer is not None:
+                            pacer.window.on_resource_error()
+                        await asyncio.sleep(0.1)
+                if handoff:
+                    handoffs.add(handoff[0])
+                    handoff[0].add_done_callback(handoffs.discard)
+                await results.put((host, port, state))
+        finally:
+            await results.put(None) # Tells the reader below that this worker has finished.
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, max_concurrency))]
+    try:
+        running = len(workers)
+        while running:
+            result = await results.get()
+            if result is None:
+                running -= 1
+            else:
+                yield result
+        for task in workers:
+            task.result() # Re-raises any unexpected error from the workers.
+        while handoffs:
+            await asyncio.gather(*handoffs)
+    finally:
+        # If the caller stops early, don't leave connection attempts running in the background.
+        leftovers = workers + list(handoffs)
+        for task in leftovers:
+            task.cancel()
+        await asyncio.gather(*leftovers, return_exceptions=True)
+
+# --- Non-blocking (selectors/epoll) Scan Engine with Adaptive Timeouts ---
+class RttEstimator:
+    """
+    Keeps track of how quickly a host answers, the same way TCP does (RFC 6298).
+    Every answer (open or refused) gives a round-trip time sample. From those samples we keep a
+    smoothed average (srtt) and how much it varies (rttvar), and the timeout becomes
+    srtt + 4 * rttvar: short for a fast LAN host, longer for a slow far-away one.
+    Until the first answer arrives, the configured starting timeout is used.
+    """
+    ALPHA = 1 / 8 # How much a new sample moves the average.
+    BETA = 1 / 4 # How much a new sample moves the variation.
+
+    def __init__(self, initial_timeout=CONNECT_TIMEOUT, min_timeout=MIN_ADAPTIVE_TIMEOUT, max_timeout=MAX_ADAPTIVE_TIMEOUT):
+        self.srtt = None
+        self.rttvar = None
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout = initial_timeout
+
+    def add_sample(self, rtt):
+        """Updates the average and the timeout with a new round-trip time (in seconds)."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.timeout = min(self.max_timeout, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+
+def scan_probes_nonblocking(probes, max_in_flight=MAX_CONCURRENT_CONNECTIONS, timeout=CONNECT_TIMEOUT, max_retries=MAX_RETRIES, pacer=None):
+    """
+    Scans many (host, port) pairs at once using non-blocking sockets and the operating system's
+    event notification (epoll on Linux, kqueue on macOS, etc. through the 'selectors' module).
+
+    Instead of waiting for each connection, every attempt is started right away (up to
+    max_in_flight at a time) and the system tells us when each one has an answer.
+    The first answers from each host are used to measure its round-trip time, and probes started
+    afterwards get a timeout based on that measurement (see RttEstimator).
+    A port that doesn't answer is retried up to max_retries times, each time with double the timeout,
+    before it is reported as filtered.
+    With a Pacer, fewer attempts may be in flight (its congestion window) and probes wait for its rate limits.
+
+    This is a generator: use it with 'for host, port, state in scan_probes_nonblocking(...)'.
+    """
+    selector = selectors.DefaultSelector()
+    rtt_by_host = {} # Every host gets its own round-trip time estimate.
+    probe_iter = iter(probes) # Probes are taken lazily, so huge sweeps never sit in memory all at once.
+    retries = deque() # Probes that timed out and get another try: (host, port, attempt number).
+    deadlines = [] # A heap of (deadline, probe id) so the next timeout is always at the front.
+    active = {} # probe id -> (socket, host, port, attempt, start time) for probes still waiting for an answer.
+    in_flight_limit = max_in_flight # Lowered when the system runs out of sockets (without a Pacer), see finish().
+    next_id = 0
+
+    def next_probe():
+        if retries:
+            return retries.popleft()
+        for host, port in probe_iter:
+            return host, port, 0
+        return None
+
+    def finish(probe_id):
+        nonlocal in_flight_limit
+        sock = active.pop(probe_id)[0]
+        selector.unregister(sock)
+        sock.close()
+        if in_flight_limit < max_in_flight:
+            # A socket is free again: grow back by about one per full window of finished probes.
+            in_flight_limit = min(max_in_flight, in_flight_limit + 1 / in_flight_limit)
+
+    try:
+        probe = next_probe()
+        while probe or active:
+            # 1) Start new connection attempts until the in-flight window is full.
+            rate_wait = None
+            while probe and len(active) < in_flight_limit and (pacer is None or pacer.window.allows(len(active))):
+                host, port, attempt = probe
+                if pacer is not None:
+                    rate_wait = pacer.rate_wait(host, time.monotonic())
+                    if rate_wait:
+                        break # Over the probes-per-second limit: wait a little before the next one.
+                if host not in rtt_by_host:
+                    rtt_by_host[host] = RttEstimator(initial_timeout=timeout)
+                sock = None
+                try:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                except OSError as e:
+                    err = e.errno
+                else:
+                    sock.setblocking(False)
+                    started = time.monotonic()
+                    err = sock.connect_ex((host, port))
+                if err in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                    selector.register(sock, selectors.EVENT_WRITE, next_id)
+                    active[next_id] = (sock, host, port, attempt, started)
+                    heapq.heappush(deadlines, (started + rtt_by_host[host].timeout * 2 ** attempt, next_id))
+                    next_id += 1
+                    probe = next_probe()
+                    continue
+                if sock is not None:
+                    sock.close()
+                if err in LOCAL_RESOURCE_ERRORS:
+                    # The system ran out of sockets: keep the probe for later and shrink the window.
+                    if pacer is not None:
+                        pacer.window.on_resource_error()
+                    else:
+                        in_flight_limit = max(1, len(active))
+                    rate_wait = 0.1 if not active else None # Nothing to wait for? Pause briefly before trying again.
+                    break
+                # Some connections (e.g. to our own machine) are answered immediately.
+                probe = next_probe()
+                yield host, port, PORT_OPEN if err == 0 else PORT_CLOSED
+
+            if not active:
+                # Nothing in flight (e.g. the last probe failed right away): there is no socket to wait for,
+                # and select() on an empty selector would never return. Only a rate limit can make us wait.
+                if rate_wait:
+                    time.sleep(rate_wait)
+                continue
+
+            # 2) Wait until a socket has an answer, the earliest probe times out or the rate limit allows a new probe.
+            wait = max(0.0, deadlines[0][0] - time.monotonic()) if deadlines else None
+            if rate_wait:
+                wait = rate_wait if wait is None else min(wait, rate_wait)
+            for key, _ in selector.select(wait):
+                probe_id = key.data
+                sock, host, port, attempt, started = active[probe_id]
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err == 0 and is_self_connection(sock):
+                    err = errno.ECONNREFUSED
+                finish(probe_id)
+                if err == 0 or err == errno.ECONNREFUSED:
+                    # A SYN-ACK (open) or a RST (closed) is a real answer from the host: measure it.
+                    rtt_by_host[host].add_sample(time.monotonic() - started)
+                    if pacer is not None:
+                        pacer.window.on_answer()
+                yield host, port, PORT_OPEN if err == 0 else PORT_CLOSED
+
+            # 3) Retry or give up on probes whose time is up.
+            now = time.monotonic()
+            while deadlines and deadlines[0][0] <= now:
+                _, probe_id = heapq.heappop(deadlines)
+                if probe_id not in active:
+                    continue # Already answered.
+                _, host, port, attempt, _ = active[probe_id]
+                finish(probe_id)
+                if pacer is not None:
+                    pacer.window.on_drop()
+                if attempt < max_retries:
+                    retries.append((host, port, attempt + 1))
+                    if probe is None:
+                        probe = next_probe()
+                else:
+                    yield host, port, PORT_FILTERED
+    finally:
+        for probe_id in list(active):
+            finish(probe_id)
+        selector.close()
+
+# --- UDP Scanning ---
+def scan_probes_udp(probes, max_in_flight=MAX_CONCURRENT_CONNECTIONS, timeout=CONNECT_TIMEOUT, max_retries=UDP_RETRIES, pacer=None):
+    """
+    Scans many (host, port) pairs over UDP at once, the same way scan_probes_nonblocking does for TCP.
+
+    UDP has no handshake, so a port is judged by what happens after we send it a packet
+    (a protocol-specific one from UDP_PAYLOADS when we have it):
+    - any reply means the port is open;
+    - an ICMP "port unreachable" message means it is closed. Every probe uses its own "connected"
+      UDP socket, so the system reports that message to us as a refused connection;
+    - no reply at all, even after max_retries retransmissions, is reported as filtered: the port is
+      either blocked by a firewall or open with a service that ignored our packet.
+    The packet is retransmitted on the same socket, so a late answer to an earlier copy still counts.
+
+    Many systems limit how many ICMP errors they send per second: on a remote host, a --host-rate
+    limit avoids closed ports being mistaken for filtered ones.
+
+    This is a generator: use it with 'for host, port, state in scan_probes_udp(...)'.
+    """
+    selector = selectors.DefaultSelector()
+    probe_iter = iter(probes)
+    deadlines = [] # A heap of (deadline, probe id) so the next retransmission is always at the front.
+    active = {} # probe id -> [socket, host, port, packets sent] for probes still waiting for an answer.
+    in_flight_limit = max_in_flight # Lowered when the system runs out of sockets (without a Pacer), see finish().
+    next_id = 0
+
+    def finish(probe_id):
+        nonlocal in_flight_limit
+        sock = active.pop(probe_id)[0]
+        selector.unregister(sock)
+        sock.close()
+        if in_flight_limit < max_in_flight:
+            # A socket is free again: grow back by about one per full window of finished probes.
+            in_flight_limit = min(max_in_flight, in_flight_limit + 1 / in_flight_limit)
+
+    try:
+        probe = next(probe_iter, None)
+        while probe or active:
+            # 1) Send the first packet of new probes until the in-flight window is full.
+            rate_wait = None
+            while probe and len(active) < in_flight_limit and (pacer is None or pacer.window.allows(len(active))):
+                host, port = probe
+                if pacer is not None:
+                    rate_wait = pacer.rate_wait(host, time.monotonic())
+                    if rate_wait:
+                        break
+                sock = None
+                try:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    sock.setblocking(False)
+                    sock.connect((host, port))
+                    sock.send(UDP_PAYLOADS.get(port, b""))
+                except OSError as e:
+                    if sock is not None:
+                        sock.close()
+                    if e.errno in LOCAL_RESOURCE_ERRORS:
+                        if pacer is not None:
+                            pacer.window.on_resource_error()
+                        else:
+                            in_flight_limit = max(1, len(active))
+                        rate_wait = 0.1 if not active else None
+                        break
+                    # The packet couldn't even be sent (e.g. no route to the host).
+                    probe = next(probe_iter, None)
+                    yield host, port, PORT_CLOSED
+                    continue
+                selector.register(sock, selectors.EVENT_READ, next_id)
+                active[next_id] = [sock, host, port, 1]
+                heapq.heappush(deadlines, (time.monotonic() + timeout, next_id))
+                next_id += 1
+                probe = next(probe_iter, None)
+
+            if not active:
+                # Nothing in flight (e.g. the last packet couldn't be sent): select() on an empty
+                # selector would never return, so only wait if a rate limit asks for it.
+                if rate_wait:
+                    time.sleep(rate_wait)
+                continue
+
+            # 2) Wait for replies (or ICMP errors), the next retransmission or the rate limit.
+            wait = max(0.0, deadlines[0][0] - time.monotonic()) if deadlines else None
+            if rate_wait:
+                wait = rate_wait if wait is None else min(wait, rate_wait)
+            for key, _ in selector.select(wait):
+                probe_id = key.data
+                sock, host, port, _ = active[probe_id]
+                try:
+                    sock.recv(UDP_MAX_REPLY)
+                    state = PORT_OPEN
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    state = PORT_CLOSED # ICMP port (or host) unreachable.
+                finish(probe_id)
+                if pacer is not None:
+                    pacer.window.on_answer()
+                yield host, port, state
+
+            # 3) Retransmit or give up on probes whose time is up.
+            now = time.monotonic()
+            while deadlines and deadlines[0][0] <= now:
+                _, probe_id = heapq.heappop(deadlines)
+                if probe_id not in active:
+                    continue # Already answered.
+                entry = active[probe_id]
+                sock, host, port, sent = entry
+                if pacer is not None:
+                    pacer.window.on_drop()
+                if sent > max_retries:
+                    finish(probe_id)
+                    yield host, port, PORT_FILTERED
+                    continue
+                try:
+                    sock.send(UDP_PAYLOADS.get(port, b""))
+                except OSError as e:
+                    if e.errno not in LOCAL_RESOURCE_ERRORS:
+                        # The ICMP error arrived just now and is reported by send() instead of recv().
+                        finish(probe_id)
+                        yield host, port, PORT_CLOSED
+                        continue
+                entry[3] = sent + 1
+                heapq.heappush(deadlines, (now + timeout * 2 ** sent, probe_id))
+    finally:
+        for probe_id in list(active):
+            finish(probe_id)
+        selector.close()
+
+# The engines that are plain generators (instead of asyncio ones), by their --engine name.
+BLOCKING_ENGINES = {"epoll": scan_probes_nonblocking, "udp": scan_probes_udp}
+
+# --- Service Fingerprinting ---
+def match_service(data):
+    """
+    Compares the first bytes a service sent us with SERVICE_SIGNATURES.
+    Returns (service name, version or detail text) for the first signature that matches, or None.
+    """
+    for name, pattern, version_group in SERVICE_SIGNATURES:
+        match = pattern.match(data)
+        if match:
+            version = match.group(version_group) if version_group else None
+            return name, version.decode("latin-1").strip() if version else ""
+    return None
+
+class ServiceFingerprinter:
+    """
+    The optional second stage of the scan: it receives connections to open ports
+    from the scan engine and works out which service is really listening.
+
+    First it simply listens, because many services (SSH, SMTP, FTP, POP3, IMAP, MySQL, VNC...)
+    greet the client as soon as it connects. If nothing arrives, it sends a tiny HTTP HEAD request.
+    Whatever comes back is matched against SERVICE_SIGNATURES.
+    At most max_concurrency ports are fingerprinted at the same time, independently of
+    how many connection attempts the scan itself has in flight. When all the slots are busy,
+    start() makes the scan wait, so open connections never pile up faster than they are handled.
+    """
+    def __init__(self, on_result, max_concurrency=FINGERPRINT_CONCURRENCY, timeout=BANNER_TIMEOUT):
+        self.on_result = on_result # Called once per port as on_result(host, port, service, detail); service is None if unknown.
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.timeout = timeout
+
+    async def _read(self, reader):
+        try:
+            return await asyncio.wait_for(reader.read(BANNER_MAX_BYTES), self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            return b""
+
+    async def start(self, host, port, reader, writer):
+        """
+        The on_open hand-off for scan_probes_async(): waits for a free slot, then fingerprints the
+        connection in a background task and returns that task. The slot is taken before the task
+        is created, so the scan worker that found the open port waits here while every slot is busy.
+        """
+        try:
+            await self.semaphore.acquire()
+        except BaseException: # The scan was stopped while waiting: the connection won't be used.
+            writer.close()
+            raise
+        task = asyncio.create_task(self.identify(host, port, reader, writer))
+        task.add_done_callback(lambda _: self.semaphore.release())
+        return task
+
+    async def identify(self, host, port, reader, writer):
+        """Fingerprints one open connection, reports the result and closes the connection."""
+        try:
+            data = await self._read(reader)
+            if not data:
+                try:
+                    writer.write(HTTP_PROBE)
+                    await writer.drain()
+                    data = await self._read(reader)
+                except OSError:
+                    pass
+            match = match_service(data)
+            if match:
+                self.on_result(host, port, *match)
+            elif data:
+                self.on_result(host, port, "Unrecognized", data[:40].decode("latin-1").strip())
+            else:
+                self.on_result(host, port, None, "") # The service stayed silent.
+        finally:
+            writer.close()
+
+# --- Targets and Sweep Scheduling ---
+def load_targets_file(path):
+    """
+    Reads targets from a text file: one target (address, hostname or CIDR network) per line.
+    Blank lines and anything after a '#' are ignored, so the file can contain comments.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                yield from line.replace(",", " ").split()
+
+def expand_targets(specs):
+    """
+    Turns target specifications into single hosts.
+    A CIDR network such as '10.0.0.0/24' becomes every usable address inside it,
+    while plain addresses and hostnames are passed through unchanged.
+    """
+    for spec in specs:
+        if "/" in spec:
+            try:
+                network = ipaddress.ip_network(spec, strict=False)
+            except ValueError:
+                print(f"Error: '{spec}' is not a valid network. Skipping it.", file=sys.stderr)
+                continue
+            for address in network.hosts():
+                yield str(address)
+        else:
+            yield spec
+
+class DnsCache:
+    """
+    Remembers which IP address each hostname resolved to, for DNS_CACHE_TTL seconds.
+    Names that couldn't be resolved are remembered too (as None), for DNS_NEGATIVE_TTL seconds.
+    It is shared by the resolver threads, so every access holds a lock.
+    """
+    def __init__(self, ttl=DNS_CACHE_TTL, negative_ttl=DNS_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries = {} # name -> (ip or None, expiry time)
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """Returns (True, ip) for a name that is still cached (ip is None if it failed), or (False, None)."""
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.monotonic():
+                del self.entries[name] # Too old: it will be looked up again.
+                return False, None
+            return True, entry[0]
+
+    def put(self, name, ip):
+        ttl = self.ttl if ip is not None else self.negative_ttl
+        with self.lock:
+            self.entries[name] = (ip, time.monotonic() + ttl)
+
+DNS_CACHE = DnsCache() # Used by every scan in this process unless another cache is given.
+
+def lookup_host(name, cache=DNS_CACHE):
+    """Returns the IP address of a hostname (from the cache when possible), or None if it can't be resolved."""
+    cached, ip = cache.get(name)
+    if cached:
+        return ip
+    try:
+        ip = socket.gethostbyname(name)
+    except (socket.gaierror, UnicodeError):
+        ip = None
+    cache.put(name, ip)
+    return ip
+
+def resolve_targets(targets, on_error=None, workers=RESOLVE_WORKERS, cache=DNS_CACHE):
+    """
+    Converts every target into its numerical IP address, skipping the ones that can't be resolved.
+    Each address is returned only once, even if several names point to it.
+    Unresolvable names are passed to on_error(name) if given, otherwise an error is printed.
+
+    Addresses written as numbers come out straight away. Hostnames are looked up by up to
+    'workers' threads at once, and each address comes out as soon as its lookup finishes,
+    so the results are not always in the same order as the targets.
+    """
+    seen = set()
+
+    def accept(target, ip):
+        if ip is None:
+            if on_error is not None:
+                on_error(target)
+            else:
+                print(f"Error: Cannot resolve the target host '{target}'. Skipping it.", file=sys.stderr)
+            return False
+        if ip in seen:
+            return False
+        seen.add(ip)
+        return True
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    lookups = {} # future -> hostname, for the lookups still running
+    try:
+        for target in targets:
+            try:
+                ip = str(ipaddress.IPv4Address(target)) # Already an address: nothing to look up.
+            except ValueError:
+                lookups[pool.submit(lookup_host, target, cache)] = target
+                if len(lookups) < workers * 4:
+                    continue
+                # Enough lookups queued up: hand out the finished ones before reading more targets.
+                finished, _ = wait(lookups, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if accept(lookups.pop(future), future.result()):
+                        yield future.result()
+                continue
+            if accept(target, ip):
+                yield ip
+        for future in as_completed(list(lookups)):
+            if accept(lookups.pop(future), future.result()):
+                yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def interleave_probes(hosts, ports):
+    """
+    Decides the order in which (host, port) pairs are probed.
+    Instead of finishing one host before starting the next, we go port by port across all hosts:
+    first port 20 on every host, then port 21 on every host, and so on.
+    This way no single computer receives a burst of connections, and one slow host
+    can't hold up the whole sweep.
+    """
+    for port in ports:
+        for host in hosts:
+            yield host, port
+
+def stream_probes(hosts, ports, on_host=None):
+    """
+    Like interleave_probes(), but for hosts that are still arriving, e.g. from resolve_targets():
+    the scan starts on the first addresses while the rest are still being looked up.
+
+    The hosts are read in a helper thread. Every host that has arrived keeps its own position in
+    the port list, and the probes go round-robin over all of them: one port of each host, then the
+    next port of each host, and so on. Hosts that arrive later simply join the next round, so a host
+    that resolved early never receives all its probes in one burst while waiting for the others.
+    on_host(host) is called for every host just before its first probe, e.g. to tell the report about it.
+    """
+    arrived = queue.Queue()
+    done = object() # Marks the end of the hosts in the queue.
+
+    def read_hosts():
+        try:
+            for host in hosts:
+                arrived.put(host)
+        finally:
+            arrived.put(done)
+    threading.Thread(target=read_hosts, daemon=True).start()
+
+    ports = list(ports)
+    if not ports:
+        return
+    active = deque() # [host, index of its next port], in round-robin order
+    finished = False
+
+    def add(host):
+        nonlocal finished
+        if host is done:
+            finished = True
+            return
+        if on_host is not None:
+            on_host(host)
+        active.append([host, 0])
+
+    while active or not finished:
+        if not active:
+            add(arrived.get()) # Nothing to probe yet: wait for the next host.
+        # Hosts that arrived during the last round join this one.
+        while not finished:
+            try:
+                add(arrived.get_nowait())
+            except queue.Empty:
+                break
+        for _ in range(len(active)):
+            cursor = active.popleft()
+            yield cursor[0], ports[cursor[1]]
+            cursor[1] += 1
+            if cursor[1] < len(ports):
+                active.append(cursor)
+
+# --- Compact Result Storage ---
+# Each port result is stored as a 2-bit code, so four ports fit in a single byte.
+STATE_UNKNOWN = 0 # Not scanned (yet).
+STATE_CODES = {PORT_CLOSED: 1, PORT_OPEN: 2, PORT_FILTERED: 3}
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+
+# Saved result files (checkpoints, baselines) start with this marker, so we never load a wrong file by mistake.
+RESULTS_FILE_MAGIC = b"PSCAN1\n"
+
+class ScanResults:
+    """
+    Stores the state of every scanned port for every host in a compact form.
+
+    Instead of keeping one Python object per result, all results live in a single array('B')
+    where every byte holds the state of four ports (2 bits each), one fixed-size row per host.
+    Ports are numbered by their position in the scanned port list, so scanning the top 100 ports
+    costs 25 bytes per host (about 1.6 MB of results for a whole /16 network) and a full
+    1-65535 scan costs 16 KB per host.
+
+    Every scanned port takes its 2 bits, even the (usually many) closed ones, so full-range scans of
+    big networks need a lot of memory: about 16 MB for 1,000 hosts, and about 1 GB for a whole /16.
+    For those, scan the network in parts (e.g. a /24 at a time) or use fewer ports.
+
+    Two result sets can be merged (e.g. to combine partial scans) or diffed
+    (e.g. to see what changed since last night) quickly; when both use the same port list
+    this works on the packed bytes directly instead of port by port.
+    """
+    def __init__(self, ports):
+        self.ports = array("H", sorted(set(ports))) # Sorted so a port's position can be found with bisect.
+        self.row_size = (len(self.ports) + 3) // 4 # Bytes needed per host.
+        self.rows = {} # host -> where its row starts in self.data
+        self.data = array("B")
+        self.changed_at = {} # host -> when (seconds since 1970) its results last changed, used by incremental scans
+
+    def _index(self, port):
+        """Returns the position of a port in the port list, or None if it isn't part of this scan."""
+        i = bisect.bisect_left(self.ports, port)
+        return i if i < len(self.ports) and self.ports[i] == port else None
+
+    def _row(self, host):
+        """Returns where a host's row starts, adding an empty row for a new host."""
+        start = self.rows.get(host)
+        if start is None:
+            start = self.rows[host] = len(self.data)
+            self.data.frombytes(bytes(self.row_size))
+        return start
+
+    def _get_code(self, start, i):
+        return (self.data[start + (i >> 2)] >> ((i & 3) * 2)) & 3
+
+    def _set_code(self, start, i, code):
+        shift = (i & 3) * 2
+        b = start + (i >> 2)
+        self.data[b] = (self.data[b] & ~(3 << shift) & 0xFF) | (code << shift)
+
+    def packed_row(self, host):
+        """Returns the raw packed bytes of a host (empty if the host is unknown)."""
+        start = self.rows.get(host)
+        return b"" if start is None else self.data[start:start + self.row_size].tobytes()
+
+    def record(self, host, port, state):
+        """Saves the state ("open", "closed" or "filtered") of one port on one host."""
+        i = self._index(port)
+        if i is None:
+            raise ValueError(f"Port {port} is not part of this scan.")
+        self._set_code(self._row(host), i, STATE_CODES[state])
+
+    def state(self, host, port):
+        """Returns the saved state of a port, or None if it wasn't scanned."""
+        i = self._index(port)
+        start = self.rows.get(host)
+        if i is None or start is None:
+            return None
+        return STATE_NAMES.get(self._get_code(start, i))
+
+    def items(self, host):
+        """Yields (port, state) for every scanned port of a host, in port order."""
+        start = self.rows.get(host)
+        if start is None:
+            return
+        ports = self.ports
+        for b, packed in enumerate(self.data[start:start + self.row_size]):
+            if packed == 0:
+                continue # Quick skip: none of these four ports were scanned.
+            for i in range(b * 4, min(b * 4 + 4, len(ports))):
+                code = (packed >> ((i & 3) * 2)) & 3
+                if code != STATE_UNKNOWN:
+                    yield ports[i], STATE_NAMES[code]
+
+    def open_ports(self, host):
+        """Returns the list of open ports found on a host."""
+        return [port for port, state in self.items(host) if state == PORT_OPEN]
+
+    def save(self, path):
+        """
+        Writes the results to a compact binary file: a small JSON header (hosts and change times),
+        then the port list and the packed states exactly as they are kept in memory.
+        The file is written under a temporary name first, so a crash never leaves a half-written file behind.
+        """
+        header = json.dumps({"port_count": len(self.ports), "hosts": list(self.rows), "changed_at": self.changed_at}).encode("utf-8")
+        ports = array("H", self.ports)
+        if sys.byteorder == "big":
+            ports.byteswap() # Port numbers are always stored little-endian.
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(RESULTS_FILE_MAGIC)
+            f.write(len(header).to_bytes(4, "big"))
+            f.write(header)
+            f.write(ports.tobytes())
+            f.write(self.data.tobytes())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Reads results written by save(). Raises ValueError if the file isn't a valid results file."""
+        with open(path, "rb") as f:
+            if f.read(len(RESULTS_FILE_MAGIC)) != RESULTS_FILE_MAGIC:
+                raise ValueError(f"'{path}' is not a port scanner results file.")
+            header = json.loads(f.read(int.from_bytes(f.read(4), "big")))
+            ports = array("H")
+            ports.frombytes(f.read(header["port_count"] * 2))
+            if sys.byteorder == "big":
+                ports.byteswap()
+            results = cls(ports)
+            results.data.frombytes(f.read())
+        if len(results.data) != len(header["hosts"]) * results.row_size:
+            raise ValueError(f"'{path}' is truncated or damaged.")
+        results.rows = {host: i * results.row_size for i, host in enumerate(header["hosts"])}
+        results.changed_at = header["changed_at"]
+        return results
+
+    def merge(self, other):
+        """
+        Copies every known result from another ScanResults into this one.
+        Results in 'other' win, so merging a newer scan updates older states.
+        """
+        self.changed_at.update(other.changed_at)
+        same_ports = self.ports == other.ports
+        for host, their_start in other.rows.items():
+            if not same_ports:
+                for port, state in other.items(host):
+                    if self._index(port) is not None:
+                        self.record(host, port, state)
+                continue
+            new_host = host not in self.rows
+            start = self._row(host)
+            if new_host:
+                self.data[start:start + self.row_size] = other.data[their_start:their_start + self.row_size]
+                continue
+            for b in range(self.row_size):
+                their_byte = other.data[their_start + b]
+                if their_byte == 0:
+                    continue # Nothing known for these four ports.
+                # Build a mask of the 2-bit slots that are known in 'other', and take those.
+                mask = 0
+                for shift in (0, 2, 4, 6):
+                    if (their_byte >> shift) & 3:
+                        mask |= 3 << shift
+                self.data[start + b] = (self.data[start + b] & ~mask & 0xFF) | their_byte
+
+    def diff(self, previous):
+        """
+        Compares these results with an earlier scan and yields (host, port, old_state, new_state)
+        for every port whose state changed. Ports or hosts that only one of the two scans looked at are skipped.
+        """
+        same_ports = self.ports == previous.ports
+        for host, start in self.rows.items():
+            their_start = previous.rows.get(host)
+            if their_start is None:
+                continue
+            if not same_ports:
+                for port, new_state in self.items(host):
+                    old_state = previous.state(host, port)
+                    if old_state is not None and old_state != new_state:
+                        yield host, port, old_state, new_state
+                continue
+            if self.packed_row(host) == previous.packed_row(host):
+                continue # Quick path: the whole host is unchanged.
+            for b in range(self.row_size):
+                if self.data[start + b] == previous.data[their_start + b]:
+                    continue
+                for i in range(b * 4, min(b * 4 + 4, len(self.ports))):
+                    new, old = self._get_code(start, i), previous._get_code(their_start, i)
+                    if new != old and new and old:
+                        yield host, self.ports[i], STATE_NAMES[old], STATE_NAMES[new]
+
+class SweepReport:
+    """
+    Collects the results of a sweep as they arrive and prints them per host.
+    Open ports are printed immediately; when the last port of a host is done,
+    a one-line summary for that host is printed along with the overall progress.
+
+    In incremental mode (with a baseline from a previous run), only changes are printed:
+    ports that are newly open, or that were open before and aren't anymore.
+    With a checkpoint path, the results so far are saved every CHECKPOINT_INTERVAL seconds.
+    """
+    def __init__(self, hosts, ports, baseline=None, checkpoint_path=None):
+        self.results = ScanResults(ports) # Every result is kept here, packed, for later use.
+        self.port_count = len(ports)
+        self.total_hosts = len(hosts)
+        self.hosts_done = 0
+        # For each host, how many ports are still waiting for a result.
+        self.pending = dict.fromkeys(hosts, len(ports))
+        self.totals = {PORT_OPEN: 0, PORT_CLOSED: 0, PORT_FILTERED: 0}
+        self.services = {} # (host, port) -> (service, detail) found by fingerprinting
+        self.baseline = baseline
+        self.changes = 0
+        self.checkpoint_path = checkpoint_path
+        self.last_checkpoint = time.monotonic()
+
+    def resume(self, previous, keep_partial_hosts=True):
+        """
+        Takes over the results of an interrupted scan, so those ports don't need to be scanned again.
+        With keep_partial_hosts=False only hosts that were completely finished are taken over
+        (the others will be scanned again from the start).
+        """
+        for host in self.pending:
+            known = [(port, state) for port, state in previous.items(host) if self.results._index(port) is not None]
+            if not known or (not keep_partial_hosts and len(known) < self.pending[host]):
+                continue
+            for port, state in known:
+                self.results.record(host, port, state)
+                self.totals[state] += 1
+            self.pending[host] -= len(known)
+            if self.pending[host] == 0:
+                self.hosts_done += 1
+        self.results.changed_at.update(previous.changed_at)
+
+    def add_host(self, host):
+        """Adds a host that was resolved after the report was created (see stream_probes())."""
+        if host not in self.pending:
+            self.pending[host] = self.port_count
+            self.total_hosts += 1
+
+    def is_done(self, host, port):
+        """Tells whether a port already has a result (e.g. from a resumed checkpoint)."""
+        return self.results.state(host, port) is not None
+
+    def record(self, host, port, state):
+        """Counts one result, printing it if the port is open and the host summary if the host is finished."""
+        self.results.record(host, port, state)
+        self.totals[state] += 1
+        self._report_port(host, port, state)
+        self.pending[host] -= 1
+        if self.pending[host] == 0:
+            self._host_finished(host)
+        self.maybe_checkpoint()
+
+    def _report_port(self, host, port, state):
+        if self.baseline is None:
+            if state == PORT_OPEN:
+                service = COMMON_SERVICES.get(port, "Unknown Service")
+                print(f"{host} - Port {port} is OPEN: {service}")
+            return
+        old_state = self.baseline.state(host, port)
+        if old_state is None:
+            old_state = PORT_CLOSED if host in self.baseline.rows else None # A brand new host: every open port is news.
+        if (state == PORT_OPEN) != (old_state == PORT_OPEN) and (old_state is not None or state == PORT_OPEN):
+            self.changes += 1
+            self.results.changed_at[host] = time.time()
+            change = "NEWLY OPEN" if state == PORT_OPEN else f"NO LONGER OPEN (now {state})"
+            print(f"{host} - Port {port} is {change}: {COMMON_SERVICES.get(port, 'Unknown Service')}")
+
+    def maybe_checkpoint(self, force=False):
+        """Saves the results so far if a checkpoint file was requested and enough time has passed."""
+        if self.checkpoint_path and (force or time.monotonic() - self.last_checkpoint >= CHECKPOINT_INTERVAL):
+            self.results.save(self.checkpoint_path)
+            self.last_checkpoint = time.monotonic()
+
+    def record_service(self, host, port, service, detail):
+        """Saves and prints what fingerprinting found on an open port."""
+        if service is None:
+            return
+        self.services[host, port] = (service, detail)
+        print(f"{host} - Port {port} fingerprint: {service}{' (' + detail + ')' if detail else ''}")
+
+    def record_shard(self, shard_results, shard_services, hosts, port_count):
+        """
+        Adds the results of a finished shard (from a worker process) in one go.
+        The shard covered port_count ports on each of the given hosts.
+        """
+        self.results.merge(shard_results)
+        for (host, port), (service, detail) in shard_services.items():
+            self.record_service(host, port, service, detail)
+        for host in hosts:
+            for port, state in shard_results.items(host):
+                self.totals[state] += 1
+                self._report_port(host, port, state)
+            self.pending[host] -= port_count
+            if self.pending[host] == 0:
+                self._host_finished(host)
+        self.maybe_checkpoint()
+
+    def _host_finished(self, host):
+        self.hosts_done += 1
+        if self.baseline is not None:
+            return # Incremental mode only reports changes.
+        counts = {PORT_OPEN: 0, PORT_CLOSED: 0, PORT_FILTERED: 0}
+        for _, host_state in self.results.items(host):
+            counts[host_state] += 1
+        print(f"Host {host} done: {counts[PORT_OPEN]} open, {counts[PORT_CLOSED]} closed, "
+              f"{counts[PORT_FILTERED]} filtered [{self.hosts_done}/{self.total_hosts} hosts]")
+
+def make_pacer(max_window, pacing):
+    """
+    Creates the Pacer for one scan loop. 'pacing' is None to scan at full speed,
+    or a dictionary with the optional "rate" and "host_rate" limits (probes per second).
+    """
+    return None if pacing is None else Pacer(max_window, **pacing)
+
+async def run_async_scan(probes, report, max_concurrency, timeout, fingerprint=False, pacing=None):
+    """
+    Runs the concurrent scan, passing every result to the report the moment it is known.
+    With fingerprint=True, open connections also go through a ServiceFingerprinter.
+    """
+    on_open = ServiceFingerprinter(report.record_service).start if fingerprint else None
+    async for host, port, state in scan_probes_async(probes, max_concurrency, timeout, on_open, make_pacer(max_concurrency, pacing)):
+        report.record(host, port, state)
+
+def run_nonblocking_scan(probes, report, max_in_flight, timeout, pacing=None, engine="epoll"):
+    """
+    Same as run_async_scan(), but uses one of the BLOCKING_ENGINES: by default the non-blocking
+    TCP engine with adaptive timeouts, or "udp" for a UDP scan.
+    """
+    pacer = make_pacer(max_in_flight, pacing)
+    for host, port, state in BLOCKING_ENGINES[engine](probes, max_in_flight, timeout, pacer=pacer):
+        report.record(host, port, state)
+
+# --- Incremental Scans ---
+def select_recently_changed(hosts, baseline, days):
+    """
+    Keeps only the hosts worth rescanning in a quick incremental run: hosts whose results changed
+    in the last 'days' days according to the baseline, plus hosts the baseline has never seen.
+    """
+    cutoff = time.time() - days * 86400
+    return [host for host in hosts if host not in baseline.rows or baseline.changed_at.get(host, 0) >= cutoff]
+
+def build_new_baseline(results, baseline=None):
+    """
+    Combines the previous baseline (if any) with this run's results, so hosts that were skipped
+    this time keep their old results. Hosts seen for the first time are marked as changed now.
+    """
+    combined = ScanResults(results.ports)
+    if baseline is not None:
+        combined.merge(baseline)
+    combined.merge(results)
+    now = time.time()
+    for host in results.rows:
+        if baseline is None or host not in baseline.rows:
+            combined.changed_at[host] = now
+    return combined
+
+# --- Multi-core Sharding ---
+def plan_shards(hosts, ports, shard_count):
+    """
+    Cuts the hosts x ports work into shard_count pieces of about the same size.
+    With many hosts, every piece gets a share of the hosts and all the ports;
+    with few hosts (e.g. a full port scan of one computer), every piece gets all the hosts and a share of the ports.
+    Pieces take every N-th item instead of a block, so each one is spread across the whole range.
+    Returns a list of (hosts, ports) pairs.
+    """
+    if len(hosts) >= shard_count:
+        return [(hosts[k::shard_count], ports) for k in range(shard_count)]
+    shard_count = min(shard_count, len(ports))
+    return [(hosts, ports[k::shard_count]) for k in range(shard_count)]
+
+def scan_shard(hosts, shard_ports, all_ports, engine, concurrency, timeout, fingerprint=False, pacing=None):
+    """
+    Runs in a worker process: scans one shard with its own concurrent engine
+    and sends back the packed results together with any fingerprinted services.
+    The results use the full port list so that the parent process can merge them
+    with a fast byte-level copy.
+    """
+    results = ScanResults(all_ports)
+    services = {}
+    probes = interleave_probes(hosts, shard_ports)
+    if engine in BLOCKING_ENGINES:
+        pacer = make_pacer(concurrency, pacing)
+        for host, port, state in BLOCKING_ENGINES[engine](probes, concurrency, timeout, pacer=pacer):
+            results.record(host, port, state)
+    else:
+        async def collect():
+            def save_service(host, port, service, detail):
+                if service is not None:
+                    services[host, port] = (service, detail)
+            on_open = ServiceFingerprinter(save_service).start if fingerprint else None
+            async for host, port, state in scan_probes_async(probes, concurrency, timeout, on_open, make_pacer(concurrency, pacing)):
+                results.record(host, port, state)
+        asyncio.run(collect())
+    return results, services
+
+def run_sharded_scan(hosts, ports, report, workers, engine, concurrency, timeout, fingerprint=False, pacing=None):
+    """
+    Spreads the scan over several processes (usually one per CPU core), each running its own
+    concurrent engine with up to 'concurrency' connections in flight.
+    Probes-per-second limits are shared out evenly, so all workers together stay within them.
+    As soon as a worker finishes a shard, its results are merged into the report here in the parent.
+    """
+    if pacing is not None:
+        pacing = {name: limit / workers if limit else limit for name, limit in pacing.items()}
+    shards = plan_shards(hosts, ports, workers * SHARDS_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(scan_shard, shard_hosts, shard_ports, ports, engine, concurrency, timeout, fingerprint, pacing): (shard_hosts, len(shard_ports))
+            for shard_hosts, shard_ports in shards
+        }
+        for future in as_completed(futures):
+            shard_hosts, port_count = futures[future]
+            report.record_shard(*future.result(), shard_hosts, port_count)
+
+# --- Library API ---
+# One result of a scan: the port's state, and the service running on it
+# (found by fingerprinting, or guessed from the port number) with optional details such as the version.
+ScanRecord = namedtuple("ScanRecord", ["host", "port", "state", "service", "detail"])
+
+class Scanner:
+    """
+    A simple way to use the scanner from other Python programs, without starting a subprocess.
+
+        scanner = Scanner(["192.168.1.0/24"], "top100")
+        for record in scanner.scan():            # or: async for record in scanner.scan_async()
+            print(record.host, record.port, record.state)
+
+    Nothing happens when the Scanner is created: target names are resolved (and your local IP looked up,
+    if no targets are given) only when the first scan starts. Results come out one ScanRecord at a time
+    as soon as they are known; with fingerprint=True an open port's record waits until its service is identified.
+    """
+    def __init__(self, targets=None, ports=None, engine="asyncio", concurrency=MAX_CONCURRENT_CONNECTIONS,
+                 timeout=CONNECT_TIMEOUT, fingerprint=False, pacing=True, rate=None, host_rate=None):
+        if engine != "asyncio" and engine not in BLOCKING_ENGINES:
+            raise ValueError("engine must be 'asyncio', 'epoll' or 'udp'.")
+        if fingerprint and engine != "asyncio":
+            raise ValueError("fingerprint=True needs the asyncio engine.")
+        if isinstance(targets, str):
+            targets = [targets]
+        self.targets = list(targets) if targets else None
+        if isinstance(ports, str):
+            ports = parse_port_spec(ports)
+        elif ports:
+            ports = list(ports)
+            for port in ports:
+                if not isinstance(port, int) or not 1 <= port <= 65535:
+                    raise ValueError(f"{port!r} is not a valid port number: use 1-65535.")
+        self.ports = sorted(set(ports)) if ports else list(PORTS_TO_SCAN)
+        self.engine = engine
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.fingerprint = fingerprint
+        self.pacing = {"rate": rate, "host_rate": host_rate} if pacing else None
+        self.unresolved = [] # Target names that couldn't be resolved, filled in when the scan starts.
+        self._hosts = None
+
+    def _resolve(self):
+        self.unresolved = []
+        targets = self.targets or [TARGET_HOST or get_local_ip()]
+        return resolve_targets(expand_targets(targets), on_error=self.unresolved.append)
+
+    def hosts(self):
+        """Returns the list of IP addresses to scan, resolving the targets the first time it's called."""
+        if self._hosts is None:
+            self._hosts = list(self._resolve())
+        return self._hosts
+
+    def _probes(self):
+        """
+        The (host, port) pairs to scan. Until the targets have been resolved once, the scan
+        starts on the first addresses while the others are still being looked up.
+        """
+        if self._hosts is not None:
+            yield from interleave_probes(self._hosts, self.ports)
+            return
+        arrived = []
+        yield from stream_probes(self._resolve(), self.ports, on_host=arrived.append)
+        self._hosts = arrived # Every target is resolved now, so later scans can reuse the list.
+
+    def _record(self, host, port, state, service=None, detail=""):
+        if service is None:
+            service = COMMON_SERVICES.get(port, "Unknown Service") if state == PORT_OPEN else ""
+        return ScanRecord(host, port, state, service, detail)
+
+    async def scan_async(self):
+        """
+        An async generator of ScanRecord objects, for programs that already use asyncio.
+        If something goes wrong during the scan, the error is raised after the records that came before it.
+        """
+        probes = self._probes()
+        records = asyncio.Queue()
+        done = object() # Marks the end of the results in the queue.
+        failure = [] # An error that stopped the scan, raised to the caller once the results end.
+
+        if self.engine in BLOCKING_ENGINES:
+            # The non-blocking engines are normal (blocking) loops, so they run in a helper thread.
+            # If the caller stops reading early, 'stop' tells the thread to end the scan too.
+            loop = asyncio.get_running_loop()
+            stop = threading.Event()
+            def deliver(item):
+                try:
+                    loop.call_soon_threadsafe(records.put_nowait, item)
+                except RuntimeError: # The event loop is already closed: nobody is reading any more.
+                    stop.set()
+            def produce():
+                pacer = make_pacer(self.concurrency, self.pacing)
+                results = BLOCKING_ENGINES[self.engine](probes, self.concurrency, self.timeout, pacer=pacer)
+                try:
+                    for host, port, state in results:
+                        if stop.is_set():
+                            break
+                        deliver(self._record(host, port, state))
+                except Exception as e:
+                    failure.append(e)
+                finally:
+                    results.close() # Stops sending probes and closes the engine's sockets.
+                    deliver(done)
+            producer = threading.Thread(target=produce, daemon=True)
+            producer.start()
+        else:
+            async def produce():
+                def on_service(host, port, service, detail):
+                    records.put_nowait(self._record(host, port, PORT_OPEN, service, detail))
+                on_open = ServiceFingerprinter(on_service).start if self.fingerprint else None
+                try:
+                    pacer = make_pacer(self.concurrency, self.pacing)
+                    async for host, port, state in scan_probes_async(probes, self.concurrency, self.timeout, on_open, pacer):
+                        if on_open is None or state != PORT_OPEN:
+                            records.put_nowait(self._record(host, port, state))
+                except Exception as e:
+                    failure.append(e)
+                finally:
+                    records.put_nowait(done)
+            producer = asyncio.create_task(produce())
+
+        try:
+            while True:
+                record = await records.get()
+                if record is done:
+                    if failure:
+                        raise failure[0]
+                    break
+                yield record
+        finally:
+            if self.engine in BLOCKING_ENGINES:
+                stop.set()
+                await asyncio.to_thread(producer.join)
+            else:
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+    def scan(self):
+        """A normal generator of ScanRecord objects, for programs that don't use asyncio."""
+        if self.engine in BLOCKING_ENGINES:
+            pacer = make_pacer(self.concurrency, self.pacing)
+            results = BLOCKING_ENGINES[self.engine](self._probes(), self.concurrency, self.timeout, pacer=pacer)
+            try:
+                for host, port, state in results:
+                    yield self._record(host, port, state)
+            finally:
+                results.close() # Also when the caller stops early: no more probes are sent.
+            return
+        loop = asyncio.new_event_loop()
+        records = self.scan_async()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(records.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(records.aclose())
+            loop.close()
+
+class RecordWriter:
+    """
+    Writes ScanRecord objects to a file as they arrive, either as JSON Lines (one JSON object per line)
+    or as CSV with a header row. Every record is flushed right away, so other programs can read the stream live.
+    """
+    def __init__(self, out, output_format="jsonl"):
+        if output_format not in ("jsonl", "csv"):
+            raise ValueError("output_format must be 'jsonl' or 'csv'.")
+        self.out = out
+        self.output_format = output_format
+        if output_format == "csv":
+            self.csv_writer = csv.writer(out)
+            self.csv_writer.writerow(ScanRecord._fields)
+
+    def write(self, record):
+        if self.output_format == "jsonl":
+            self.out.write(json.dumps(record._asdict()) + "\n")
+        else:
+            self.csv_writer.writerow(record)
+        self.out.flush()
 
 # --- Main Program Execution ---
 def main():
     """
     This is the main part of the script that runs everything.
-    It prepares the scan, then goes through each specified port and checks its status.
+    It reads the command-line options, prepares the scan, then checks all the ports
+    with the chosen engine and reports what it finds.
     """
+    parser = argparse.ArgumentParser(
+        description="Simple TCP connect (and UDP) port scanner.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Hosts to scan: IP addresses, hostnames or CIDR networks (e.g. 192.168.1.0/24).\n"
+             "If none are given (and no -iL file), your own computer's local IP is scanned."
+    )
+    parser.add_argument(
+        "-iL", "--targets-file",
+        help="Read additional targets from a file, one per line ('#' starts a comment)."
+    )
+    parser.add_argument(
+        "-p", "--ports",
+        help="Ports to scan, e.g. '1-1024,3306,8000-9000', 'top100' or '1-65535'.\n"
+             "By default the list in PORTS_TO_SCAN is used."
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=MAX_CONCURRENT_CONNECTIONS,
+        help=f"Maximum number of connection attempts in flight at once (default: {MAX_CONCURRENT_CONNECTIONS})."
+    )
+    parser.add_argument(
+        "-t", "--timeout",
+        type=float,
+        default=CONNECT_TIMEOUT,
+        help=f"Seconds to wait for each connection attempt (default: {CONNECT_TIMEOUT}).\n"
+             "With --engine epoll this is only the starting value, adjusted from measured round-trip times;\n"
+             f"with --engine udp it is the wait before each of the {UDP_RETRIES} retransmissions (doubled every time)."
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each running its own concurrent scan (default: 1).\n"
+             "Use 0 for one per CPU core. --concurrency then applies to each worker."
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Never send more than this many probes per second in total."
+    )
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        help="Never send more than this many probes per second to any single host."
+    )
+    parser.add_argument(
+        "--no-pacing",
+        action="store_true",
+        help="Always keep --concurrency attempts in flight instead of adapting to the network\n"
+             "(turns off the congestion window; can't be combined with --rate or --host-rate)."
+    )
+    parser.add_argument(
+        "-e", "--engine",
+        choices=["asyncio", "epoll", "udp", "sequential"],
+        default="asyncio",
+        help="asyncio: concurrent scan with a fixed timeout (default).\n"
+             "epoll: non-blocking sockets with adaptive timeouts, fastest for large scans.\n"
+             "udp: scan UDP ports instead, sending real DNS, TFTP, NTP and SNMP requests where they apply.\n"
+             "     'filtered' then means no answer: blocked by a firewall, or open but silent.\n"
+             "sequential: the original one-port-at-a-time scan."
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Identify the service behind every open port from its banner or a small probe\n"
+             "instead of guessing from the port number (asyncio engine only)."
+    )
+    parser.add_argument(
+        "-f", "--format",
+        choices=["text", "jsonl", "csv"],
+        default="text",
+        help="text: readable messages (default).\n"
+             "jsonl / csv: one record per scanned port (host, port, state, service, detail)\n"
+             "streamed to standard output, for other programs to read."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help=f"Save progress to FILE every {CHECKPOINT_INTERVAL} seconds and when interrupted (Ctrl+C).\n"
+             "Running the same command again resumes from FILE; it is deleted when the scan finishes."
+    )
+    parser.add_argument(
+        "-o", "--save-results",
+        metavar="FILE",
+        help="Save the final results to FILE (compact binary format), e.g. to use as the next --baseline."
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="Results of a previous run (from --save-results). Only ports that became open\n"
+             "or stopped being open are reported. With --save-results, the saved file keeps\n"
+             "the baseline's results for hosts not scanned this time."
+    )
+    parser.add_argument(
+        "--rescan-changed",
+        metavar="DAYS",
+        type=float,
+        help="With --baseline: only scan hosts whose results changed in the last DAYS days\n"
+             "(and hosts the baseline doesn't know yet)."
+    )
+    args = parser.parse_args()
+
+    if args.concurrency <= 0 or args.timeout <= 0 or args.workers < 0:
+        print("Error: --concurrency and --timeout must be positive numbers, and --workers can't be negative.", file=sys.stderr)
+        sys.exit(1)
+    workers = args.workers or os.cpu_count() or 1
+    if (args.rate is not None and args.rate <= 0) or (args.host_rate is not None and args.host_rate <= 0):
+        print("Error: --rate and --host-rate must be positive numbers.", file=sys.stderr)
+        sys.exit(1)
+    if args.no_pacing and (args.rate or args.host_rate):
+        print("Error: --no-pacing can't be combined with --rate or --host-rate.", file=sys.stderr)
+        sys.exit(1)
+    pacing = None if args.no_pacing else {"rate": args.rate, "host_rate": args.host_rate}
+    if args.fingerprint and args.engine != "asyncio":
+        print("Error: --fingerprint reuses the connections of the asyncio engine and can't be used with --engine " + args.engine + ".", file=sys.stderr)
+        sys.exit(1)
+    if args.engine == "sequential" and (args.checkpoint or args.save_results or args.baseline):
+        print("Error: --checkpoint, --save-results and --baseline need the asyncio, epoll or udp engine.", file=sys.stderr)
+        sys.exit(1)
+    if args.format != "text" and (args.engine == "sequential" or workers > 1 or args.checkpoint or args.save_results or args.baseline):
+        print("Error: --format jsonl/csv works with a single asyncio, epoll or udp process, without --checkpoint, --save-results or --baseline.", file=sys.stderr)
+        sys.exit(1)
+    if args.rescan_changed is not None and not args.baseline:
+        print("Error: --rescan-changed needs a --baseline to know which hosts changed.", file=sys.stderr)
+        sys.exit(1)
+
+    # Load the saved results we were asked to build on (if any).
+    baseline = previous = None
+    try:
+        if args.baseline:
+            baseline = ScanResults.load(args.baseline)
+        if args.checkpoint and os.path.exists(args.checkpoint):
+            previous = ScanResults.load(args.checkpoint)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: Cannot load saved results: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.ports:
+        try:
+            ports = parse_port_spec(args.ports)
+        except ValueError as e:
+            print(f"Error: Invalid port specification: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        ports = PORTS_TO_SCAN
+
+    target_specs = list(args.targets)
+    if args.targets_file:
+        try:
+            target_specs.extend(load_targets_file(args.targets_file))
+        except OSError as e:
+            print(f"Error: Cannot read targets file '{args.targets_file}': {e}", file=sys.stderr)
+            sys.exit(1)
+    if not target_specs:
+        target_specs = [TARGET_HOST or get_local_ip()]
+
+    if args.format != "text":
+        # Machine-readable output: only records go to standard output, errors go to standard error.
+        scanner = Scanner(target_specs, ports, args.engine, args.concurrency, args.timeout, args.fingerprint,
+                          pacing=pacing is not None, rate=args.rate, host_rate=args.host_rate)
+        writer = RecordWriter(sys.stdout, args.format)
+        for record in scanner.scan():
+            writer.write(record)
+        for name in scanner.unresolved:
+            print(f"Error: Cannot resolve the target host '{name}'. Skipped it.", file=sys.stderr)
+        if not scanner.hosts():
+            print("Error: None of the target hosts could be resolved.", file=sys.stderr)
+            sys.exit(1)
+        return
+
     print("-" * 50)
-    print(f"Starting port scan on: {TARGET_HOST}")
+    print(f"Starting port scan on: {', '.join(target_specs[:5])}{' ...' if len(target_specs) > 5 else ''}")
     print(f"Scan started at: {datetime.now()}")
     print("-" * 50)
 
-    try:
-        # Get the actual numerical IP address from the hostname (if one was provided)
-        target_ip = socket.gethostbyname(TARGET_HOST)
-    except socket.gaierror:
-        print(f"Error: Cannot resolve the target host '{TARGET_HOST}'. Please check the name or IP address.")
-        sys.exit(1) # Exit if the target host isn't valid
+    # Get the actual numerical IP addresses from the hostnames (if any were provided).
+    # Usually the scan starts on the first addresses while the other names are still being looked up;
+    # resuming a checkpoint, choosing hosts by their changes, or sharing them out between workers
+    # needs the complete list first.
+    hosts = resolve_targets(expand_targets(target_specs))
+    streaming = workers == 1 and previous is None and args.rescan_changed is None
+    if not streaming:
+        hosts = list(hosts)
+        if not hosts:
+            print("Error: None of the target hosts could be resolved. Please check the names or IP addresses.")
+            sys.exit(1) # Exit if no target host is valid
+
+    if args.rescan_changed is not None:
+        hosts = select_recently_changed(hosts, baseline, args.rescan_changed)
+        print(f"Rescanning {len(hosts)} host(s) that changed in the last {args.rescan_changed:g} day(s).")
+
+    if args.engine == "sequential":
+        # Go through each (host, port) pair and scan it
+        scanned_hosts = []
+        for host, port in stream_probes(hosts, ports, on_host=scanned_hosts.append):
+            scan_port(host, port)
+        if not scanned_hosts:
+            print("Error: None of the target hosts could be resolved. Please check the names or IP addresses.")
+            sys.exit(1)
+    else:
+        report = SweepReport([] if streaming else hosts, ports, baseline, args.checkpoint)
+        probes = stream_probes(hosts, ports, on_host=report.add_host) if streaming else interleave_probes(hosts, ports)
+        if previous is not None:
+            # Continue an interrupted scan: skip everything the checkpoint already has.
+            report.resume(previous, keep_partial_hosts=workers == 1)
+            probes = (probe for probe in probes if not report.is_done(*probe))
+            print(f"Resuming from checkpoint '{args.checkpoint}': {report.hosts_done}/{len(hosts)} hosts already done.")
+        try:
+            if workers > 1:
+                unfinished = [host for host in hosts if report.pending[host]]
+                run_sharded_scan(unfinished, ports, report, workers, args.engine, args.concurrency, args.timeout, args.fingerprint, pacing)
+            elif args.engine in BLOCKING_ENGINES:
+                run_nonblocking_scan(probes, report, args.concurrency, args.timeout, pacing, args.engine)
+            else:
+                asyncio.run(run_async_scan(probes, report, args.concurrency, args.timeout, args.fingerprint, pacing))
+        except KeyboardInterrupt:
+            if not args.checkpoint:
+                raise
+            report.maybe_checkpoint(force=True)
+            print(f"\nScan interrupted. Progress saved to '{args.checkpoint}'; run the same command again to resume.")
+            sys.exit(130)
 
-    # Loop through each port in our list and scan it
-    for port in PORTS_TO_SCAN:
-        scan_port(target_ip, port)
+        if not report.total_hosts:
+            print("Error: None of the target hosts could be resolved. Please check the names or IP addresses.")
+            sys.exit(1)
+        totals = report.totals
+        print(f"Hosts: {report.total_hosts}, Open: {totals[PORT_OPEN]}, Closed: {totals[PORT_CLOSED]}, Filtered: {totals[PORT_FILTERED]}")
+        if baseline is not None:
+            print(f"Changes since the baseline: {report.changes}")
+        if args.save_results:
+            build_new_baseline(report.results, baseline).save(args.save_results)
+            print(f"Results saved to '{args.save_results}'.")
+        if args.checkpoint and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint) # The scan is complete, so there's nothing left to resume.
 
     print("-" * 50)
     print("Port scan completed.")
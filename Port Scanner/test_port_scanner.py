@@ -0,0 +1,264 @@
+import asyncio
+import errno
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from port_scanner import (BLOCKING_ENGINES, TOP_PORTS, ScanResults, Scanner, ServiceFingerprinter, parse_port_spec,
+                          scan_probes_async, scan_probes_nonblocking, scan_probes_udp)
+
+
+class CountingScanner(Scanner):
+    """A Scanner that counts how many probes the engine has taken."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.probes_taken = 0
+
+    def _probes(self):
+        for probe in super()._probes():
+            self.probes_taken += 1
+            yield probe
+
+
+class PortSpecTest(unittest.TestCase):
+    def test_ranges_and_top_ports(self):
+        self.assertEqual(parse_port_spec("22, 80-82,22,top3"), sorted({22, 80, 81, 82, *TOP_PORTS[:3]}))
+        self.assertEqual(len(parse_port_spec("1-65535")), 65535)
+
+    def test_invalid_specs(self):
+        for spec in ("", ",", "0", "65536", "10-5", "http", "1-2-3", "top0", f"top{len(TOP_PORTS) + 1}", "topx"):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    parse_port_spec(spec)
+
+
+class ScanResultsTest(unittest.TestCase):
+    def make_results(self, states, ports=(21, 22, 80, 443, 8080)):
+        results = ScanResults(ports)
+        for (host, port), state in states.items():
+            results.record(host, port, state)
+        return results
+
+    def test_record_and_read_back(self):
+        results = self.make_results({("10.0.0.1", 22): "open", ("10.0.0.1", 80): "closed", ("10.0.0.2", 8080): "filtered"})
+        self.assertEqual(results.state("10.0.0.1", 22), "open")
+        self.assertIsNone(results.state("10.0.0.1", 443)) # Not scanned.
+        self.assertIsNone(results.state("10.0.0.3", 22)) # Unknown host.
+        self.assertEqual(list(results.items("10.0.0.1")), [(22, "open"), (80, "closed")])
+        self.assertEqual(results.open_ports("10.0.0.1"), [22])
+        with self.assertRaises(ValueError):
+            results.record("10.0.0.1", 25, "open") # Not part of this scan.
+
+    def test_save_and_load(self):
+        results = self.make_results({("10.0.0.1", 22): "open", ("10.0.0.2", 443): "filtered", ("10.0.0.2", 21): "closed"})
+        results.changed_at["10.0.0.1"] = 1234.5
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "results.bin")
+            results.save(path)
+            loaded = ScanResults.load(path)
+            with open(path, "r+b") as f:
+                f.truncate(os.path.getsize(path) - 1)
+            with self.assertRaises(ValueError):
+                ScanResults.load(path)
+        self.assertEqual(list(loaded.ports), list(results.ports))
+        for host in ("10.0.0.1", "10.0.0.2"):
+            self.assertEqual(list(loaded.items(host)), list(results.items(host)))
+        self.assertEqual(loaded.changed_at, {"10.0.0.1": 1234.5})
+
+    def test_merge_and_diff(self):
+        for other_ports in ((21, 22, 80, 443, 8080), (22, 80, 3306)): # Same port list (packed path) and a different one.
+            with self.subTest(other_ports=other_ports):
+                old = self.make_results({("10.0.0.1", 22): "open", ("10.0.0.1", 80): "open", ("10.0.0.2", 22): "closed"})
+                new = self.make_results({("10.0.0.1", 22): "closed", ("10.0.0.3", 80): "open"}, other_ports)
+                self.assertEqual(list(new.diff(old)), [("10.0.0.1", 22, "open", "closed")])
+                old.merge(new)
+                self.assertEqual(list(old.items("10.0.0.1")), [(22, "closed"), (80, "open")]) # Newer result wins, the rest stays.
+                self.assertEqual(old.state("10.0.0.2", 22), "closed")
+                self.assertEqual(old.state("10.0.0.3", 80), "open")
+
+
+def run_with_timeout(engine, probes, seconds=5):
+    """Runs a blocking engine in a helper thread; returns its results, or None if it didn't finish in time."""
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(engine(probes, pacer=None)), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return None if thread.is_alive() else results
+
+
+class EngineTerminationTest(unittest.TestCase):
+    """An engine must end even when its last probe fails right away and nothing is left in flight."""
+
+    # Connecting or sending to the broadcast address fails at once (permission denied or no route).
+    FAILING_PROBE = ("255.255.255.255", 80)
+
+    def test_nonblocking_last_probe_fails(self):
+        self.assertEqual(run_with_timeout(scan_probes_nonblocking, [self.FAILING_PROBE]),
+                         [("255.255.255.255", 80, "closed")])
+
+    def test_udp_last_probe_fails(self):
+        self.assertEqual(run_with_timeout(scan_probes_udp, [self.FAILING_PROBE]),
+                         [("255.255.255.255", 80, "closed")])
+
+
+class EarlyBreakTest(unittest.TestCase):
+    """Stopping the iteration early must stop the scan too, for every blocking engine."""
+
+    def setUp(self):
+        self.thread_errors = []
+        self.old_hook = threading.excepthook
+        threading.excepthook = self.thread_errors.append
+
+    def tearDown(self):
+        threading.excepthook = self.old_hook
+
+    def make_scanner(self, engine):
+        return CountingScanner(["127.0.0.1"], "1-5000", engine=engine, concurrency=50, timeout=0.2, pacing=False)
+
+    def assert_stopped(self, scanner):
+        taken = scanner.probes_taken
+        time.sleep(0.5)
+        self.assertEqual(scanner.probes_taken, taken, "probes were still sent after the break")
+        self.assertLess(taken, 5000)
+        self.assertEqual(self.thread_errors, [])
+
+    def test_scan_async_break(self):
+        for engine in BLOCKING_ENGINES:
+            with self.subTest(engine=engine):
+                scanner = self.make_scanner(engine)
+
+                async def read_five():
+                    records = scanner.scan_async()
+                    count = 0
+                    async for _ in records:
+                        count += 1
+                        if count == 5:
+                            break
+                    await records.aclose()
+                    self.assertFalse([t for t in threading.enumerate() if t.name.endswith("(produce)")])
+
+                asyncio.run(read_five())
+                self.assert_stopped(scanner)
+
+    def test_scan_break(self):
+        for engine in BLOCKING_ENGINES:
+            with self.subTest(engine=engine):
+                scanner = self.make_scanner(engine)
+                records = scanner.scan()
+                for count, _ in enumerate(records, 1):
+                    if count == 5:
+                        break
+                records.close()
+                self.assert_stopped(scanner)
+
+
+class RunningOutOfSockets(socket.socket):
+    """A socket class that fails once with EMFILE when 20 sockets are open, and counts open sockets."""
+    open_now = 0
+    failed = False
+    peak_after_error = 0
+
+    def __init__(self, *args, **kwargs):
+        if RunningOutOfSockets.open_now == 20 and not RunningOutOfSockets.failed:
+            RunningOutOfSockets.failed = True
+            raise OSError(errno.EMFILE, "Too many open files")
+        super().__init__(*args, **kwargs)
+        RunningOutOfSockets.open_now += 1
+        if RunningOutOfSockets.failed:
+            RunningOutOfSockets.peak_after_error = max(RunningOutOfSockets.peak_after_error, RunningOutOfSockets.open_now)
+
+    def close(self):
+        if self.fileno() != -1:
+            RunningOutOfSockets.open_now -= 1
+        super().close()
+
+
+class ResourceErrorTest(unittest.TestCase):
+    """After running out of sockets once, an unpaced engine must grow back to its full concurrency."""
+
+    def test_in_flight_limit_recovers(self):
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) # Receives the probes but never answers.
+        silent.bind(("127.0.0.1", 0))
+        self.addCleanup(silent.close)
+        probes = [silent.getsockname()] * 1000
+        with mock.patch("socket.socket", RunningOutOfSockets):
+            results = list(scan_probes_udp(probes, 40, 0.02, max_retries=0))
+        self.assertEqual(len(results), 1000)
+        self.assertTrue(RunningOutOfSockets.failed)
+        self.assertEqual(RunningOutOfSockets.peak_after_error, 40)
+
+
+class FailingScanner(Scanner):
+    """A Scanner whose list of probes breaks after the first one."""
+    def _probes(self):
+        yield "127.0.0.1", 1
+        raise RuntimeError("probe list broken")
+
+
+class ScanErrorTest(unittest.TestCase):
+    """Errors inside the scan must reach the caller instead of ending the results quietly."""
+
+    def test_errors_are_raised(self):
+        for engine in ["asyncio", *BLOCKING_ENGINES]:
+            with self.subTest(engine=engine):
+                scanner = FailingScanner(["127.0.0.1"], [1], engine=engine, timeout=0.2)
+
+                async def read_all():
+                    return [record async for record in scanner.scan_async()]
+
+                with self.assertRaisesRegex(RuntimeError, "probe list broken"):
+                    asyncio.run(read_all())
+                with self.assertRaisesRegex(RuntimeError, "probe list broken"):
+                    list(scanner.scan())
+
+    def test_invalid_port_list(self):
+        for ports in ([1, 2, 70000], [0], ["80"]):
+            with self.subTest(ports=ports):
+                with self.assertRaises(ValueError):
+                    Scanner("127.0.0.1", ports)
+
+
+class FingerprintBackpressureTest(unittest.TestCase):
+    """Open connections must wait for a free fingerprinting slot instead of piling up."""
+
+    def test_handoffs_are_bounded(self):
+        async def run():
+            accepted = []
+            async def on_connect(reader, writer):
+                accepted.append(writer) # Stays silent, so each fingerprint waits for the full timeout.
+            servers = [await asyncio.start_server(on_connect, "127.0.0.1", 0) for _ in range(8)]
+            ports = [server.sockets[0].getsockname()[1] for server in servers]
+
+            fingerprinter = ServiceFingerprinter(lambda *result: None, max_concurrency=2, timeout=0.1)
+            pending = busiest = 0 # Connections handed over whose fingerprinting hasn't finished yet.
+            def finished(task):
+                nonlocal pending
+                pending -= 1
+            async def on_open(*connection):
+                nonlocal pending, busiest
+                task = await fingerprinter.start(*connection)
+                pending += 1
+                busiest = max(busiest, pending)
+                task.add_done_callback(finished)
+                return task
+            states = [state async for _, _, state in scan_probes_async(
+                [("127.0.0.1", port) for port in ports], max_concurrency=8, timeout=1, on_open=on_open)]
+
+            for server in servers:
+                server.close()
+            for writer in accepted:
+                writer.close()
+            return states, busiest, pending
+
+        states, busiest, pending = asyncio.run(run())
+        self.assertEqual(states, ["open"] * 8)
+        self.assertLessEqual(busiest, 2)
+        self.assertEqual(pending, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+import argparse # Command-line options, like in generate_password.py
+import cProfile # The --profile option: shows which functions take the most time
+import json # Saves and reads the results (--json, --compare)
+import os # Finds generate_password.py next to this script
+import platform # Records which Python the results come from
+import pstats # Prints the --profile report
+import subprocess # Starts fresh Python processes to measure the start-up time
+import sys # Error messages and the path of the Python program
+import time # The clock used for every measurement
+import tracemalloc # Measures the peak memory of a run
+
+# This script measures how fast generate_password.py is, so that a change that makes it slower
+# is noticed. It must be next to generate_password.py.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+import generate_password # The code being measured
+
+# --- Benchmark Settings ---
+# The password rules that are measured: a name and the PasswordPolicy options for it.
+POLICIES = {
+    "characters": {},
+    "dictionary": {"use_dictionary": True},
+    "custom-symbols": {"custom_symbols_set": "#@$-"},
+    "spaces": {"use_spaces": True},
+}
+DEFAULT_LENGTHS = [8, 16, 32, 64]
+# Batch size 1 means one generate() call per password; bigger sizes use generate_many() (bulk mode).
+DEFAULT_BATCH_SIZES = [1, 1000, generate_password.BULK_BATCH_SIZE]
+# Passwords generated in each measurement, and how many times each measurement is repeated (the best time counts).
+DEFAULT_COUNT = 20000
+DEFAULT_REPEAT = 3
+# Start-up time: how many fresh Python processes are started (the fastest counts).
+STARTUP_RUNS = 5
+# With --compare, a result this much slower than the saved one (0.10 = 10%) is reported as a regression.
+DEFAULT_TOLERANCE = 0.10
+
+
+# --- Measurements ---
+def generate(policy, count, batch_size):
+    """Generates 'count' passwords with the policy, one by one or in batches, and returns how many characters they had."""
+    if batch_size == 1:
+        return sum(len(policy.generate()) for _ in range(count))
+    return sum(len(password) for password in policy.generate_many(count, batch_size))
+
+def measure(policy, count, batch_size, repeat):
+    """
+    Times the generation of 'count' passwords ('repeat' times, keeping the fastest run, which is the
+    one least disturbed by other programs) and then measures its peak memory in one more run.
+    tracemalloc slows everything down, so it is never switched on while the time is being measured.
+    """
+    best = float('inf')
+    characters = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        characters = generate(policy, count, batch_size)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    generate(policy, count, batch_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "passwords_per_second": round(count / best),
+        "ns_per_character": round(best * 1e9 / characters, 1),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+def measure_startup(runs=STARTUP_RUNS):
+    """
+    Measures, in milliseconds, how long a fresh Python takes to import generate_password and to run
+    the script for one password (what a program calling the script pays every time). The fastest run counts.
+    """
+    commands = {
+        "import_ms": [sys.executable, "-c", "import generate_password"],
+        "startup_ms": [sys.executable, os.path.join(SCRIPT_DIR, "generate_password.py")],
+        "python_only_ms": [sys.executable, "-c", "pass"], # Python itself, for comparison.
+    }
+    results = {}
+    for name, command in commands.items():
+        best = float('inf')
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, check=True)
+            best = min(best, time.perf_counter() - start)
+        results[name] = round(best * 1000, 1)
+    return results
+
+def run_benchmarks(policy_names, lengths, batch_sizes, count, repeat):
+    """Measures every combination of policy, length and batch size and returns the results as a list."""
+    results = []
+    for name in policy_names:
+        for length in lengths:
+            try:
+                policy = generate_password.PasswordPolicy(length, **POLICIES[name])
+            except ValueError as e:
+                print(f"Skipping {name} with length {length}: {e}", file=sys.stderr)
+                continue
+            for batch_size in batch_sizes:
+                result = {"policy": name, "length": length, "batch_size": batch_size}
+                result.update(measure(policy, count, batch_size, repeat))
+                print(f"{name:<15}{length:>7}{batch_size:>8}{result['passwords_per_second']:>14,}"
+                      f"{result['ns_per_character']:>12}{result['peak_memory_kb']:>12}")
+                results.append(result)
+    return results
+
+
+# --- Comparison with Saved Results ---
+def compare(results, startup, saved, tolerance):
+    """
+    Compares the new results with results saved earlier (--json) and prints every measurement
+    that got more than 'tolerance' slower. Returns the number of regressions found.
+    """
+    old_speeds = {(r["policy"], r["length"], r["batch_size"]): r["passwords_per_second"] for r in saved.get("results", [])}
+    regressions = 0
+    for result in results:
+        old = old_speeds.get((result["policy"], result["length"], result["batch_size"]))
+        if old and result["passwords_per_second"] < old * (1 - tolerance):
+            regressions += 1
+            print(f"Regression: {result['policy']}, length {result['length']}, batch {result['batch_size']}: "
+                  f"{old:,} -> {result['passwords_per_second']:,} passwords/sec "
+                  f"({100 * (result['passwords_per_second'] / old - 1):+.0f}%)", file=sys.stderr)
+    for name, new in startup.items():
+        old = saved.get("startup", {}).get(name)
+        if name != "python_only_ms" and old and new > old * (1 + tolerance):
+            regressions += 1
+            print(f"Regression: {name} {old} -> {new} ms", file=sys.stderr)
+    return regressions
+
+
+# --- Main Program Execution Block ---
+def main():
+    """Parses the options, runs the benchmarks, and saves or compares the results."""
+    parser = argparse.ArgumentParser(
+        description="Measure the speed and memory use of generate_password.py.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--policies",
+        nargs="+",
+        choices=list(POLICIES),
+        default=list(POLICIES),
+        help="The password rules to measure (default: all of them)."
+    )
+    parser.add_argument(
+        "--lengths",
+        nargs="+",
+        type=int,
+        default=DEFAULT_LENGTHS,
+        help=f"The password lengths to measure (default: {' '.join(map(str, DEFAULT_LENGTHS))})."
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        nargs="+",
+        type=int,
+        default=DEFAULT_BATCH_SIZES,
+        help=f"The batch sizes to measure (default: {' '.join(map(str, DEFAULT_BATCH_SIZES))}). \n1 means one generate() call per password."
+    )
+    parser.add_argument(
+        "-n", "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help=f"Passwords generated in each measurement (default: {DEFAULT_COUNT})."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"How many times each measurement is repeated; the fastest run counts (default: {DEFAULT_REPEAT})."
+    )
+    parser.add_argument(
+        "--json",
+        type=str,
+        metavar="FILE",
+        help="Save the results to this JSON file, to compare later runs with it."
+    )
+    parser.add_argument(
+        "--compare",
+        type=str,
+        metavar="FILE",
+        help="Compare with results saved earlier with --json; exits with an error if anything got slower \nthan --tolerance allows."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"How much slower a result may be before --compare calls it a regression (default: {DEFAULT_TOLERANCE}, i.e. 10%%)."
+    )
+    parser.add_argument(
+        "--no-startup",
+        action="store_true",
+        help="Skip the import and start-up time measurement."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run the benchmarks under cProfile and print the functions that took the most time."
+    )
+    args = parser.parse_args()
+
+    if args.count <= 0 or args.repeat <= 0 or any(n <= 0 for n in args.lengths + args.batch_sizes):
+        print("Error: --count, --repeat, --lengths and --batch-sizes must be positive integers.", file=sys.stderr)
+        sys.exit(1)
+    saved = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading '{args.compare}': {e}", file=sys.stderr)
+            sys.exit(1)
+        # Profiling makes everything several times slower, so only runs made the same way can be compared.
+        if saved.get("profiled", False) != args.profile:
+            print(f"Error: '{args.compare}' was saved {'with' if saved.get('profiled') else 'without'} --profile; "
+                  f"run the comparison {'with' if saved.get('profiled') else 'without'} --profile too.", file=sys.stderr)
+            sys.exit(1)
+
+    print(f"{'policy':<15}{'length':>7}{'batch':>8}{'passwords/s':>14}{'ns/char':>12}{'peak KB':>12}")
+    if args.profile:
+        profiler = cProfile.Profile()
+        results = profiler.runcall(run_benchmarks, args.policies, args.lengths, args.batch_sizes, args.count, args.repeat)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("tottime").print_stats(20)
+    else:
+        results = run_benchmarks(args.policies, args.lengths, args.batch_sizes, args.count, args.repeat)
+
+    startup = {}
+    if not args.no_startup:
+        startup = measure_startup()
+        print(f"Import: {startup['import_ms']} ms, one password from the command line: {startup['startup_ms']} ms "
+              f"(Python alone: {startup['python_only_ms']} ms)")
+
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "count": args.count,
+            "profiled": args.profile, # Profiled runs are much slower: don't compare them with normal ones.
+            "results": results,
+            "startup": startup,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if saved is not None:
+        regressions = compare(results, startup, saved, args.tolerance)
+        if regressions:
+            print(f"{regressions} regression(s) found.", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions.")
+
+if __name__ == "__main__":
+    main()
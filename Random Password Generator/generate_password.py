@@ -1,18 +1,296 @@
-import random # Used for picking random characters and shuffling the password
+import random # Its SystemRandom class draws secure random numbers from the operating system
 import string # Provides handy sets of characters like all lowercase letters, all digits, etc.
 import argparse # This is what allows us to create easy-to-use commands
+import bisect # Fast lookups in the passphrase tables
+import itertools # Combinations and running totals for the policy tables
+import math # Sizes the uniqueness check's memory
 import sys # Helps us exit the program nicely if something goes wrong
 import os # Used to check if your custom dictionary file actually exists
+import unicodedata # Brings dictionary words to one standard form
+from array import array # Compact arrays of numbers for the word index
 
 # --- Default Symbol Set ---
 # Defines the standard set of special characters used by the generator unless a custom set is provided.
 DEFAULT_SYMBOLS = string.punctuation
 
+# --- Secure Randomness ---
+# The plain 'random' functions are predictable and not meant for secrets, so every random choice
+# is made from the operating system's secure generator (os.urandom / random.SystemRandom).
+# Modules that are only needed by some options (json, hashlib, threading, ...) are imported inside
+# the functions that use them, so a single password starts as fast as possible.
+# RandomBuffer asks the generator for this many bytes at a time.
+RANDOM_BLOCK_SIZE = 4096
+system_random = random.SystemRandom()
+
+# --- Bulk Generation Settings ---
+# In bulk mode (--count), passwords are produced and written in batches of this many.
+BULK_BATCH_SIZE = 10000
+# With several worker processes (--workers), the passwords are split into this many pieces ("shards")
+# per worker, so the first pieces can already be written out while the others are being generated.
+SHARDS_PER_WORKER = 4
+
+# --- Dictionary Mode Settings ---
+# A passphrase is made of at most this many words, so it stays easy to remember.
+MAX_PASSPHRASE_WORDS = 5
+
+# --- Uniqueness Check Settings ---
+# With --unique, a Bloom filter remembers every password already produced (see UniqueFilter).
+# UNIQUE_ERROR_RATE is the chance that a brand new password is mistaken for a repeat:
+# it is then simply thrown away and replaced, so a higher rate only costs a little time, never a duplicate.
+UNIQUE_ERROR_RATE = 0.001
+# If this many passwords in a row turn out to be repeats, the rules can't produce enough different passwords.
+UNIQUE_MAX_STREAK = 1000
+
+# --- Strength Check Settings ---
+# With --check, dictionary words shorter than this are ignored: almost any text contains short words like "a" or "in".
+CHECK_MIN_WORD_LENGTH = 3
+# Strength levels by estimated entropy (in bits): below 28 is "very weak", below 36 "weak", and so on.
+STRENGTH_LEVELS = ((28, "very weak"), (36, "weak"), (60, "fair"), (80, "strong"), (math.inf, "very strong"))
+# Common look-alike substitutions ("p4ssw0rd"), undone before looking for dictionary words.
+LEET_TABLE = str.maketrans("0134578@$!|", "oieastbasil")
+
+# --- Server Mode Settings ---
+# With --serve, the script keeps running as a small web server that only accepts connections
+# from this computer (SERVE_HOST) and hands out passwords on request.
+SERVE_HOST = "127.0.0.1"
+# How many passwords are kept ready in advance for each set of rules (--pool-size).
+POOL_SIZE = 1000
+# The background refill generates this many passwords at a time, so requests never wait long for it.
+POOL_REFILL_BATCH = 100
+# The most passwords one request can ask for, the longest password it can ask for,
+# and the most different sets of rules the server keeps pools for.
+SERVE_MAX_COUNT = 10000
+SERVE_MAX_LENGTH = 1024
+SERVE_MAX_POLICIES = 64
+
+# --- Word List Index ---
+class WordList:
+    """
+    A read-only list of words that takes very little memory and loads very quickly.
+
+    All the words are kept together in one block of UTF-8 bytes ('blob'), with an array saying where
+    each word starts ('offsets'); a word only becomes a Python string when it is asked for.
+    The words are sorted by length (shortest first), and 'length_starts[n]' is the position of the
+    first word with n or more characters, so all the words up to a given length are one slice.
+    It works like a normal list for len(), indexing, iteration and random.choice().
+    """
+    def __init__(self, blob, offsets, length_starts, start=0, stop=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.length_starts = length_starts
+        self.start = start
+        self.stop = len(offsets) - 1 if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        index += self.start
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def of_length(self, length):
+        """Returns the words with exactly 'length' characters (a view, nothing is copied)."""
+        if length + 1 >= len(self.length_starts):
+            return WordList(self.blob, self.offsets, self.length_starts, self.stop, self.stop)
+        start = max(self.start, self.length_starts[length])
+        return WordList(self.blob, self.offsets, self.length_starts, start, max(start, min(self.stop, self.length_starts[length + 1])))
+
+    def up_to_length(self, max_length):
+        """Returns the words with at most max_length characters (a view, nothing is copied)."""
+        stop = self.length_starts[max_length + 1] if max_length + 1 < len(self.length_starts) else self.stop
+        return WordList(self.blob, self.offsets, self.length_starts, self.start, min(self.stop, stop))
+
+    @classmethod
+    def from_words(cls, words):
+        """Builds a WordList from any list of words (which should already be free of duplicates)."""
+        words = sorted(words, key=len)
+        encoded = [word.encode('utf-8') for word in words]
+        offsets = array('I', [0])
+        total = 0
+        for word in encoded:
+            total += len(word)
+            offsets.append(total)
+        length_starts = array('I')
+        for index, word in enumerate(words):
+            while len(length_starts) <= len(word):
+                length_starts.append(index)
+        length_starts.append(len(words))
+        return cls(b''.join(encoded), offsets, length_starts)
+
+# Index files start with this marker, so a wrong file is never mistaken for an index.
+WORD_INDEX_MAGIC = b"PWDIDX1\n"
+# The indexes are saved in the user's cache folder (not next to the word lists, which may be in a shared
+# or read-only place), named after the word file plus this ending. PASSWORD_GENERATOR_CACHE chooses another folder.
+WORD_INDEX_SUFFIX = ".idx"
+WORD_INDEX_FOLDER_NAME = "generate_password"
+word_index_folder_cache = None
+
+def word_index_folder():
+    """
+    Returns the folder for the word indexes, creating it if needed: $PASSWORD_GENERATOR_CACHE, else the
+    user's cache folder (~/.cache, or %LOCALAPPDATA% on Windows), else a private folder in the system's
+    temporary folder. Returns None if none can be used; the word lists are then simply read every time.
+    A folder is only used if it belongs to the current user, so nobody else can slip in a fake index.
+    """
+    global word_index_folder_cache
+    if word_index_folder_cache is not None:
+        return word_index_folder_cache or None
+    candidates = []
+    if os.environ.get("PASSWORD_GENERATOR_CACHE"):
+        candidates.append(os.environ["PASSWORD_GENERATOR_CACHE"])
+    if os.name == 'nt' and os.environ.get("LOCALAPPDATA"):
+        candidates.append(os.path.join(os.environ["LOCALAPPDATA"], WORD_INDEX_FOLDER_NAME))
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    candidates.append(os.path.join(cache_home, WORD_INDEX_FOLDER_NAME))
+    import tempfile # Only needed for this last fallback.
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get("USERNAME", "user")
+    candidates.append(os.path.join(tempfile.gettempdir(), f"{WORD_INDEX_FOLDER_NAME}-{user}"))
+    word_index_folder_cache = ''
+    for folder in candidates:
+        try:
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+            if hasattr(os, 'getuid') and os.stat(folder).st_uid != os.getuid():
+                continue
+            if os.access(folder, os.W_OK):
+                word_index_folder_cache = folder
+                break
+        except OSError:
+            continue
+    return word_index_folder_cache or None
+
+def word_index_path(filepath):
+    """Where the index of a word file is kept (or None): its name, plus a short hash of its full path so files with the same name don't clash."""
+    folder = word_index_folder()
+    if folder is None:
+        return None
+    full_path = os.path.abspath(filepath)
+    import hashlib # Only the word index needs it.
+    name = f"{os.path.basename(full_path)}-{hashlib.sha256(full_path.encode('utf-8', 'surrogatepass')).hexdigest()[:16]}"
+    return os.path.join(folder, name + WORD_INDEX_SUFFIX)
+
+def normalize_word(word):
+    """
+    Cleans up one entry of a word list: removes surrounding spaces, the dice numbers of
+    diceware-style lists ("11111  abacus") and differences in letter case and Unicode form,
+    so the same word is always written the same way (and counted only once).
+    """
+    parts = word.split()
+    if len(parts) == 2 and parts[0].isdigit():
+        parts = parts[1:]
+    return unicodedata.normalize('NFC', ' '.join(parts)).lower()
+
+def read_word_file(filepath):
+    """
+    Reads a word list line by line (so even very large files never have to fit in memory as text).
+    Words can be separated by commas or new lines. Returns the normalized words, each one only once,
+    in the order they first appear.
+    """
+    words = {} # A dict keeps the order and drops repeats.
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            for word in line.split(','):
+                word = normalize_word(word)
+                if word:
+                    words[word] = None
+    return list(words)
+
+def file_digest(filepath):
+    """Returns the SHA-256 hash of a file, read in pieces."""
+    import hashlib # Only the word index needs it.
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def save_word_index(index_path, words, source_stat, source_digest):
+    """
+    Saves a WordList to a binary index file: a small JSON header describing the source file
+    (its size, modification time and hash), then the offsets, the length table and the words.
+    The file is written under a temporary name first, so a crash never leaves a half-written index.
+    """
+    import json # Only the word index needs it.
+    header = json.dumps({
+        "size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns, "sha256": source_digest,
+        "count": len(words.offsets) - 1, "lengths": len(words.length_starts),
+    }).encode('utf-8')
+    offsets, length_starts = array('I', words.offsets), array('I', words.length_starts)
+    if sys.byteorder == 'big':
+        offsets.byteswap() # Numbers are always stored little-endian.
+        length_starts.byteswap()
+    temp_path = f"{index_path}.{os.getpid()}.tmp" # One per process, in case several save the same index.
+    with open(temp_path, 'wb') as f:
+        f.write(WORD_INDEX_MAGIC)
+        f.write(len(header).to_bytes(4, 'big'))
+        f.write(header)
+        f.write(offsets.tobytes())
+        f.write(length_starts.tobytes())
+        f.write(words.blob)
+    os.replace(temp_path, index_path)
+
+def load_word_index(index_path, filepath, source_stat):
+    """
+    Loads the index of a dictionary file, or returns None if there is no usable index.
+    The index is trusted when the file's size and modification time still match; if only the
+    modification time changed (e.g. the file was copied), the file's hash decides.
+    """
+    import json # Only the word index needs it.
+    try:
+        with open(index_path, 'rb') as f:
+            if f.read(len(WORD_INDEX_MAGIC)) != WORD_INDEX_MAGIC:
+                return None
+            header = json.loads(f.read(int.from_bytes(f.read(4), 'big')))
+            if header["size"] != source_stat.st_size:
+                return None
+            if header["mtime_ns"] != source_stat.st_mtime_ns and header["sha256"] != file_digest(filepath):
+                return None
+            offsets, length_starts = array('I'), array('I')
+            offsets.frombytes(f.read((header["count"] + 1) * offsets.itemsize))
+            length_starts.frombytes(f.read(header["lengths"] * length_starts.itemsize))
+            blob = f.read()
+    except (OSError, ValueError, KeyError):
+        return None
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+        length_starts.byteswap()
+    if len(offsets) != header["count"] + 1 or len(length_starts) != header["lengths"] or (offsets and offsets[-1] != len(blob)):
+        return None # Truncated or damaged: the index will simply be built again.
+    return WordList(blob, offsets, length_starts)
+
+def load_word_list(filepath):
+    """
+    Loads a word file as a WordList, from its saved index when that is still up to date;
+    otherwise the file is read and a new index is saved in the cache folder (see word_index_folder()).
+    Returns an empty WordList if the file has no words. Errors reading the file are raised.
+    """
+    source_stat = os.stat(filepath)
+    index_path = word_index_path(filepath)
+    words = load_word_index(index_path, filepath, source_stat) if index_path else None
+    if words is not None:
+        return words # The saved index is still up to date.
+    words = WordList.from_words(read_word_file(filepath))
+    if len(words) and index_path:
+        try:
+            save_word_index(index_path, words, source_stat, file_digest(filepath))
+        except OSError:
+            pass # The index only makes the next run faster (e.g. the disk may be full).
+    return words
+
 # --- Function to load words from a file ---
 def load_words_from_file(filepath):
     """
     This function attempts to load a list of words from a specified file path.
-    It expects words within the file to be comma-separated.
+    Words within the file can be separated by commas or new lines; repeated words are kept only once.
+    The first time a file is loaded, a compact index of its words is saved in the cache folder
+    (see word_index_folder()), so later runs load even huge word lists almost instantly.
     In case of file not found errors, empty files, or invalid formatting,
     it will issue a warning and return an empty list, prompting the use of internal word lists.
     """
@@ -20,145 +298,463 @@ def load_words_from_file(filepath):
     if not os.path.exists(filepath):
         print(f"Error: Dictionary file not found at '{filepath}'. Using internal word lists.", file=sys.stderr)
         return [] # Returns an empty list if the file does not exist.
-    
+
     try:
-        # Opens and reads the file content.
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read().strip() # Reads all content and removes leading/trailing whitespace.
-            if not content:
-                print(f"Warning: Dictionary file '{filepath}' is empty. Using internal word lists.", file=sys.stderr)
-                return [] # Returns an empty list if the file is empty.
-            
-            # Splits the content by commas and strips whitespace from each word.
-            words = [word.strip() for word in content.split(',') if word.strip()]
-            if not words:
-                print(f"Warning: No valid words found in '{filepath}'. Expected comma-separated words. Using internal word lists.", file=sys.stderr)
-            return words # Returns the processed list of words.
+        if os.path.getsize(filepath) == 0:
+            print(f"Warning: Dictionary file '{filepath}' is empty. Using internal word lists.", file=sys.stderr)
+            return [] # Returns an empty list if the file is empty.
+        words = load_word_list(filepath)
+        if not words:
+            print(f"Warning: No valid words found in '{filepath}'. Expected comma-separated words. Using internal word lists.", file=sys.stderr)
+            return []
+        return words
     except Exception as e:
         # Catches and reports any errors encountered during file reading.
         print(f"Error reading dictionary file '{filepath}': {e}. Using internal word lists.", file=sys.stderr)
         return [] # Returns an empty list upon an error.
 
 # --- Internal Word Lists (Fallback mechanism) ---
-# These predefined lists of common Italian and English words serve as a fallback
-# if no custom dictionary file is provided or if its loading fails.
-ITALIAN_WORDS = [
-    "essere", "avere", "dire", "potere", "volere", "sapere", "stare", "dovere",
-    "vedere", "andare", "venire", "dare", "parlare", "trovare", "sentire", "lasciare",
-    "prendere", "pensare", "passare", "portare", "sembrare", "usare", "pagare", "camminare",
-    "iniziare", "tornare", "chiamare", "morire", "vivere", "amare", "conoscere", "lavorare",
-    "mangiare", "bere", "dormire", "studiare", "scrivere", "leggere", "guardare", "ascoltare",
-    "comprare", "vendere", "aprire", "chiudere", "mettere", "tenere", "cercare", "mostrare",
-    "chiedere", "giocare", "entrare", "uscire", "salire", "scendere", "finire", "aspettare",
-    "aiutare", "cadere", "correre", "credere", "decidere", "diventare", "dimenticare", "divertirsi",
-    "disegnare", "distruggere", "dividere", "dubitare", "educare", "eleggere", "eliminare", "emettere",
-    "enfatizzare", "entrare", "esprimere", "estendere", "evitare", "fabbricare", "fallire", "far",
-    "fermare", "fidarsi", "figurare", "firmare", "fissare", "fornire", "formare", "frequentare",
-    "fumare", "funzionare", "gestire", "gettare", "girare", "godere", "governare", "garantire",
-    "guidare", "illuminare", "immaginare", "imparare", "impedire", "importare", "includere", "incontrare",
-    "indicare", "influenzare", "informare", "insegnare", "intendere", "interessare", "interpretare", "interrompere",
-    "intervenire", "introdurre", "invitare", "lanciare", "lavare", "liberare", "limitare", "lottare",
-    "mantenere", "meritare", "mescolare", "misurare", "modificare", "mordere", "muovere", "nascere",
-    "nascondere", "notare", "nutrire", "obbligare", "ottenere", "occupare", "offrire", "operare",
-    "organizzare", "orientare", "osservare", "partire", "partecipare", "perdere", "permettere", "piacere",
-    "piangere", "praticare", "preferire", "preparare", "presentare", "premere", "prestare", "prevedere",
-    "prevenire", "produrre", "programmare", "proibire", "promettere", "promuovere", "proporre", "proteggere",
-    "provare", "pubblicare", "pulire", "punire", "raccogliere", "raggiungere", "reagire", "realizzare",
-    "ricevere", "riconoscere", "ricordare", "registrare", "regolare", "relazionare", "rendere", "ripetere",
-    "replicare", "rappresentare", "richiedere", "risolvere", "rispondere", "restare", "restituire", "ritirare",
-    "rivedere", "rivelare", "rompere", "sacrificare", "salvare", "scaldare", "scegliere", "scoppiare",
-    "scoprire", "scusare", "sedere", "seguire", "selezionare", "significare", "simboleggiare", "simulare",
-    "smettere", "sognare", "sopportare", "sorprendere", "sostenere", "sottomettere", "sostituire", "succedere",
-    "suggerire", "suonare", "superare", "sviluppare", "tagliare", "toccare", "tollerare", "tradurre",
-    "trasferire", "trasformare", "trattare", "udire", "unire", "urlare", "usare", "utilizzare",
-    "valere", "variare", "verificare", "vestire", "viaggiare", "vincere", "visitare", "votare",
-    "abbattere", "abbinare", "abilitare", "abitare", "abolire", "abrogare", "accelerare", "accettare",
-    "accompagnare", "accordare", "accumulare", "accusare", "acquistare", "addestrare", "addizionare",
-    "adoperare", "adottare", "adorare", "affrontare", "afferrare", "affittare", "agevolare", "agganciare",
-    "aggiustare", "allargare", "alloggiare", "allontanare", "alterare", "analizzare", "animare", "annunciare",
-    "anticipare", "applicare", "appoggiare", "apprezzare", "approvare", "approfittare", "argomentare", "arredare",
-    "arrestare", "articolare", "associare", "assicurare", "attaccare", "attivare", "attribuire", "aumentare",
-    "autorizzare", "avanzare", "avvertire", "avviare", "avvolgere", "ballare", "basare", "battere",
-    "beneficiare", "bloccare", "calcolare", "catturare", "celebrare", "circolare", "combinare", "commentare",
-    "commettere", "comunicare", "concentrare", "concludere", "concordare", "condurre", "confermare", "confessare",
-    "configurare", "congiungere", "conquistare", "considerare", "consigliare", "costruire", "consumare", "consultare",
-    "contenere", "contribuire", "controllare", "convalidare", "convincere", "coprire", "correggere", "corrispondere",
-    "creare", "crescere", "criticare", "curare", "danneggiare", "decorare", "definire", "delegare",
-    "delimitare", "denunciare", "dipendere", "depositare", "derivare", "desiderare", "designare", "dettare",
-    "difendere", "differenziare", "diffondere", "dirigere", "disporre", "distinguere", "distribuire", "documentare",
-    "dominare", "donare", "elaborare", "elevare", "emanare", "emergere", "equipaggiare", "esercitare",
-    "esistere", "escludere", "eseguire", "esporre", "evidenziare", "esaminare", "festeggiare", "fissare",
-    "fondare", "formulare", "fronteggiare", "generare", "glorificare", "illustrare", "implementare", "implicare",
-    "imporre", "migliorare", "incollare", "incrementare", "innalzare", "innovare", "inserire", "ispezionare",
-    "ispirare", "istituire", "istruire", "interrogare", "inventare", "investigare", "iscrivere", "giudicare",
-    "giustificare", "levare", "licenziare", "lodare", "localizzare", "manipolare", "marciare", "mascherare",
-    "mediare", "memorizzare", "menzionare", "minacciare", "montare", "moltiplicare", "motivare", "navigare",
-    "negare", "negoziare", "nominare", "notificare", "occuparsi", "omettere", "opporsi", "ospitare",
-    "ottenere", "paragonare", "partorire", "percepire", "percorrere", "perfezionare", "persistere", "persuadere",
-    "pesare", "pianificare", "piantare", "pilotare", "presidiare", "proiettare", "promuovere", "proporre",
-    "proteggere", "provocare", "qualificare", "quantificare", "raccomandare", "radunare", "rafforzare", "rallentare",
-    "rammaricarsi", "rapire", "rapportare", "ricercare", "reclamare", "recuperare", "registrare", "regolare",
-    "relazionarsi", "rimuovere", "rinnovare", "restaurare", "riunire", "rivolgere", "ruotare", "saltare",
-    "salutare", "sanzionare", "scandire", "scartare", "sconfiggere", "scorrere", "scuotere", "segnare",
-    "seguitare", "seminare", "segnalare", "separare", "servire", "sfilare", "sfogliare", "smontare",
-    "sollevare", "sottoscrivere", "sottolineare", "spazzare", "spegnere", "spingere", "sposare", "stampare",
-    "stringere", "subire", "supplicare", "supportare", "suscitare", "svuotare", "tentare", "terminare",
-    "testare", "tossire", "tracciare", "trasmettere", "trasportare", "uccidere", "utile", "valutare",
-    "versare", "vibrare", "violaren", "vulcanizzare", "vuotare"
-]
-
-ENGLISH_WORDS = [
-    "the", "be", "to", "of", "and", "a", "in", "that", "have", "I",
-    "it", "for", "not", "on", "with", "he", "as", "you", "do", "at",
-    "this", "but", "his", "by", "from", "they", "we", "say", "her", "she",
-    "or", "an", "will", "my", "one", "all", "would", "there", "their", "what",
-    "so", "up", "out", "if", "about", "who", "get", "which", "go", "me",
-    "when", "make", "can", "like", "time", "no", "just", "him", "know", "take",
-    "person", "into", "year", "your", "good", "some", "could", "them", "see", "other",
-    "than", "then", "now", "look", "only", "come", "its", "over", "think", "also",
-    "back", "after", "use", "two", "how", "our", "work", "first", "well", "way",
-    "even", "new", "want", "because", "any", "these", "give", "day", "most", "us",
-    "love", "through", "long", "where", "both", "feel", "much", "such", "high", "every",
-    "big", "little", "though", "too", "many", "more", "find", "here", "down", "than",
-    "may", "side", "own", "make", "should", "world", "last", "very", "often", "each",
-    "same", "still", "tell", "must", "never", "did", "why", "let", "set", "run",
-    "help", "put", "start", "show", "hear", "play", "read", "write", "move", "live",
-    "believe", "bring", "happen", "next", "against", "below", "between", "face", "grow", "light",
-    "open", "walk", "meet", "keep", "turn", "begin", "call", "head", "hold", "cut",
-    "add", "change", "fall", "send", "speak", "talk", "try", "understand", "watch", "win",
-    "ask", "buy", "build", "carry", "catch", "close", "come", "cover", "cross", "cut",
-    "deal", "dream", "drive", "eat", "end", "enjoy", "enter", "escape", "explain", "fight",
-    "fill", "finish", "follow", "forget", "get", "give", "go", "grow", "hang", "have",
-    "hear", "help", "hide", "hit", "hold", "hope", "hurry", "imagine", "improve", "include",
-    "increase", "indicate", "influence", "inform", "intend", "introduce", "join", "jump", "keep", "kill",
-    "know", "laugh", "lead", "learn", "leave", "lend", "let", "lie", "lift", "like",
-    "listen", "lose", "love", "manage", "mark", "marry", "mean", "measure", "meet", "mention",
-    "mind", "miss", "move", "name", "need", "notice", "obtain", "offer", "open", "order",
-    "organize", "owe", "own", "pass", "pay", "perform", "pick", "place", "plan", "play",
-    "point", "prefer", "prepare", "present", "prevent", "produce", "promise", "protect", "prove", "provide",
-    "pull", "push", "put", "reach", "read", "realize", "receive", "recognize", "reflect", "refuse",
-    "regret", "remain", "remember", "remove", "repair", "repeat", "replace", "reply", "report", "represent",
-    "require", "resist", "resolve", "respond", "rest", "return", "reveal", "rid", "ride", "ring",
-    "rise", "roll", "run", "rush", "sail", "save", "say", "see", "seek", "seem",
-    "sell", "send", "set", "shake", "share", "shine", "shoot", "shop", "show", "shut",
-    "sing", "sit", "sleep", "slide", "slip", "smell", "smile", "smoke", "snow", "solve",
-    "sound", "speak", "spend", "stand", "start", "state", "stay", "steal", "step", "stick",
-    "stir", "stop", "store", "strike", "study", "succeed", "suggest", "suit", "supply", "support",
-    "suppose", "surprise", "surround", "survive", "suspect", "swear", "sweep", "swell", "swim", "swing",
-    "take", "talk", "teach", "tear", "tell", "think", "throw", "tie", "touch", "train",
-    "travel", "treat", "try", "turn", "understand", "undo", "unfold", "unite", "unpack", "unzip",
-    "use", "vanish", "vary", "view", "visit", "wait", "wake", "walk", "want", "warn",
-    "wash", "waste", "watch", "wear", "weigh", "welcome", "win", "wish", "withdraw", "wonder",
-    "worry", "wrap", "write", "yell", "yield", "zip", "zoom"
-]
+# Common Italian and English words, used if no custom dictionary file is provided or if its loading fails.
+# They are kept in a separate file next to this script (first line Italian, second line English) and are
+# only read the first time dictionary mode needs them, so normal passwords don't pay for loading them.
+# Like any dictionary file, they get a compact index in the cache folder (see load_words_from_file()), so later runs
+# load them instantly. The index isn't shipped with the script: the first dictionary-mode run on a computer builds it
+# (about 15 ms for these ~850 words), which is cheaper than keeping a generated binary file in sync with the text.
+BUILTIN_WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "builtin_words.txt")
+builtin_words_cache = None
+
+def load_builtin_words():
+    """Returns the built-in Italian and English words (without repeats) as one WordList, loading them on first use."""
+    global builtin_words_cache
+    if builtin_words_cache is None:
+        builtin_words_cache = load_word_list(BUILTIN_WORDS_FILE)
+    return builtin_words_cache
+
+def __getattr__(name):
+    """
+    Still provides the ITALIAN_WORDS and ENGLISH_WORDS lists for programs that use them,
+    reading them from BUILTIN_WORDS_FILE only when they are asked for.
+    """
+    if name in ("ITALIAN_WORDS", "ENGLISH_WORDS"):
+        with open(BUILTIN_WORDS_FILE, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        line = lines[0] if name == "ITALIAN_WORDS" else lines[1]
+        return [word.strip() for word in line.split(',') if word.strip()]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- Core Password Generation Logic ---
+def build_alphabet(use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces):
+    """
+    Works out which characters a password may contain.
+    Returns the alphabet (every allowed character exactly once) and a list with one set of
+    characters per selected type (lowercase, digits, ...), since every password must contain
+    at least one character of each type.
+    """
+    symbols = custom_symbols_set if custom_symbols_set else DEFAULT_SYMBOLS
+    character_types = [
+        (use_lowercase, string.ascii_lowercase),
+        (use_uppercase, string.ascii_uppercase),
+        (use_digits, string.digits),
+        (use_symbols, symbols),
+        (use_spaces, ' '),
+    ]
+    selected = [chars for used, chars in character_types if used]
+    # dict.fromkeys() removes repeated characters (e.g. in custom symbols) while keeping their order,
+    # so no character is more likely to be picked than the others.
+    alphabet = ''.join(dict.fromkeys(''.join(selected)))
+    return alphabet, [frozenset(chars) for chars in selected]
+
+class RandomBuffer:
+    """
+    Hands out secure random whole numbers, like random.SystemRandom().randrange(), but much faster when many are
+    needed: random bytes are fetched from the operating system RANDOM_BLOCK_SIZE at a time instead
+    of once per number. Small numbers take one 32-bit piece of the block each, bigger ones as many
+    bytes as they need; only the bits needed are kept and a number that is too big is drawn again,
+    so every result is equally likely.
+    """
+    def __init__(self):
+        self.pieces = array('I')
+        self.position = 0
+
+    def _refill(self):
+        self.pieces = array('I', os.urandom(RANDOM_BLOCK_SIZE))
+        self.position = 0
+
+    def randbelow(self, limit):
+        """Returns a random whole number from 0 to limit - 1."""
+        mask = (1 << (limit - 1).bit_length()) - 1
+        if mask > 0xFFFFFFFF:
+            return self._randbelow_big(limit, mask)
+        pieces = self.pieces
+        while True:
+            if self.position == len(pieces):
+                self._refill()
+                pieces = self.pieces
+            value = pieces[self.position] & mask
+            self.position += 1
+            if value < limit:
+                return value
+
+    def _randbelow_big(self, limit, mask):
+        size = (mask.bit_length() + 7) // 8
+        while True:
+            value = int.from_bytes(os.urandom(size), 'little') & mask
+            if value < limit:
+                return value
+
+    def shuffle(self, items):
+        """Puts a list in a random order, in place (Fisher-Yates shuffle)."""
+        for i in range(len(items) - 1, 0, -1):
+            j = self.randbelow(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+class CharacterSampler:
+    """
+    Picks characters uniformly at random from an alphabet, many at a time.
+
+    Instead of asking for one random number per character, random bytes are requested from the
+    operating system in large blocks (os.urandom) and turned into characters all at once with
+    bytes.translate(). A byte (0-255) is used only if it is below the largest multiple of the
+    alphabet size; the others are thrown away ("rejection sampling"). Using every byte with
+    'byte % size' would make the first characters of the alphabet slightly more likely.
+    The translation tables are built once, when the sampler is created.
+    """
+    def __init__(self, alphabet):
+        self.alphabet = ''.join(dict.fromkeys(alphabet)) # Every character once, so all are equally likely.
+        size = len(self.alphabet)
+        limit = 256 - 256 % size if size <= 256 else 0
+        # Each accepted byte first becomes the position of its character in the alphabet.
+        self.byte_table = bytes(b % size if b < limit else 0 for b in range(256)) if limit else None
+        self.rejected_bytes = bytes(range(limit, 256))
+        self.accepted_share = limit / 256
+        self.character_table = {i: char for i, char in enumerate(self.alphabet)}
+
+    def sample(self, count):
+        """Returns a string of 'count' random characters from the alphabet."""
+        if self.byte_table is None:
+            return ''.join(system_random.choice(self.alphabet) for _ in range(count)) # Too many characters for one byte each.
+        chunks = []
+        missing = count
+        while missing > 0:
+            # Ask for a little more than needed, to make up for the rejected bytes.
+            block = os.urandom(int(missing / self.accepted_share) + 64)
+            chunk = block.translate(self.byte_table, self.rejected_bytes)[:missing]
+            chunks.append(chunk)
+            missing -= len(chunk)
+        positions = b''.join(chunks).decode('latin-1') # Every position becomes one character, chr(position).
+        return positions.translate(self.character_table)
+
+# For mix_letter_case(): in ASCII, a lowercase and an uppercase letter differ only in the bit 0x20.
+# CASE_FLIP_TABLE turns a random byte into 0x20 or 0 (half the time each), and ASCII_LETTER_TABLE
+# marks the letters of a text with 0x20, so their combination says which letters to switch to uppercase.
+CASE_FLIP_TABLE = bytes(0x20 if b & 1 else 0 for b in range(256))
+ASCII_LETTER_TABLE = bytes(0x20 if chr(b).isalpha() and b < 128 else 0 for b in range(256))
+
+def flip_case(char, upper):
+    """
+    Returns the character in upper case (if 'upper' is true) or in lower case. A few letters become
+    two characters when their case changes (e.g. 'ß'.upper() is 'SS'): those are left as they are,
+    so the password keeps exactly its length.
+    """
+    changed = char.upper() if upper else char.lower()
+    return changed if len(changed) == 1 else char
+
+def change_case(word, upper):
+    """Returns the word all in upper case (if 'upper' is true) or all in lower case, without changing its length (see flip_case())."""
+    if word.isascii():
+        return word.upper() if upper else word.lower()
+    return ''.join(flip_case(char, upper) for char in word)
+
+def mix_letter_case(words):
+    """
+    Gives every letter of the words a random case (upper or lower), for all the words at once.
+
+    For plain ASCII words, the words are joined into one block of bytes and a random mask with the
+    0x20 bit set on about half of the letters is combined with it in a single XOR operation on big
+    numbers, instead of a random choice per character. Other words are handled one character at a time.
+    """
+    text = ''.join(words)
+    if not text.isascii():
+        bits = int.from_bytes(os.urandom(len(text) // 8 + 1), 'little')
+        mixed = []
+        position = 0
+        for word in words:
+            mixed.append(''.join(flip_case(char, bits >> (position + i) & 1) for i, char in enumerate(word)))
+            position += len(word)
+        return mixed
+    data = text.lower().encode('ascii')
+    mask = int.from_bytes(os.urandom(len(data)).translate(CASE_FLIP_TABLE), 'big') & int.from_bytes(data.translate(ASCII_LETTER_TABLE), 'big')
+    text = (int.from_bytes(data, 'big') ^ mask).to_bytes(len(data), 'big').decode('ascii')
+    mixed = []
+    position = 0
+    for word in words:
+        mixed.append(text[position:position + len(word)])
+        position += len(word)
+    return mixed
+
+def pick_weighted(options, cumulative, randbelow=system_random.randrange):
+    """Picks one of the options, each with a chance proportional to its weight ('cumulative' holds the running totals)."""
+    return options[bisect.bisect_right(cumulative, randbelow(cumulative[-1]))]
+
+class PassphraseSampler:
+    """
+    Picks dictionary words whose lengths add up to an exact total, with every possible
+    combination of words equally likely.
+
+    The words are grouped by length, and a table counts in how many ways each total length can be
+    reached with a given number of words. To pick a passphrase, the number of words and then the
+    length of each next word are chosen with chances proportional to how many complete
+    combinations they lead to, and the word itself is picked at random among the words of that length.
+    This takes the same short time for every word, never needs a second try, and makes each
+    combination exactly as likely as the others, so 'combinations' gives the true number of
+    possible choices (and log2 of it the entropy of the words).
+
+    The total aimed for ('target') is the budget itself, unless no combination of at most
+    max_words words reaches it exactly: then it is the longest total that can be reached.
+    """
+    def __init__(self, words_by_length, budget, max_words=MAX_PASSPHRASE_WORDS):
+        self.words_by_length = words_by_length # length -> the words that have exactly that length
+        lengths = sorted(length for length, words in words_by_length.items() if words and 0 < length <= budget)
+        # ways[n][total]: how many sequences of exactly n words have lengths adding up to 'total'.
+        ways = [[1] + [0] * budget]
+        for _ in range(max_words):
+            previous = ways[-1]
+            ways.append([0] + [
+                sum(len(words_by_length[length]) * previous[total - length] for length in lengths if length <= total)
+                for total in range(1, budget + 1)
+            ])
+        self.target = next((total for total in range(budget, 0, -1) if any(row[total] for row in ways[1:])), 0)
+        self.combinations = sum(row[self.target] for row in ways[1:])
+
+        # For every state (words still to pick, letters still to fill): the possible lengths of the next word
+        # and their running weights, worked out once so that picking a word is just a lookup.
+        self.choices = {}
+        for words_left in range(1, max_words + 1):
+            for total in range(1, self.target + 1):
+                if not ways[words_left][total]:
+                    continue
+                options, cumulative, running = [], [], 0
+                for length in lengths:
+                    if length <= total and ways[words_left - 1][total - length]:
+                        running += len(words_by_length[length]) * ways[words_left - 1][total - length]
+                        options.append(length)
+                        cumulative.append(running)
+                self.choices[words_left, total] = (options, cumulative)
+        word_counts = [n for n in range(1, max_words + 1) if ways[n][self.target]]
+        self.word_counts = (word_counts, list(itertools.accumulate(ways[n][self.target] for n in word_counts)))
+
+    def sample(self, randbelow=system_random.randrange):
+        """Returns a list of words whose lengths add up to exactly 'target'."""
+        words_left = pick_weighted(*self.word_counts, randbelow)
+        total = self.target
+        chosen = []
+        while words_left:
+            length = pick_weighted(*self.choices[words_left, total], randbelow)
+            bucket = self.words_by_length[length]
+            chosen.append(bucket[randbelow(len(bucket))])
+            words_left -= 1
+            total -= length
+        return chosen
+
+class PasswordPolicy:
+    """
+    A complete set of password rules (length, character types, dictionary mode), checked and
+    prepared ("compiled") only once, so that every password made from it is quick to generate.
+
+        policy = PasswordPolicy(length=20, use_symbols=False)
+        password = policy.generate()
+        for password in policy.generate_many(100000):
+            ...
+
+    Everything that stays the same from one password to the next is worked out when the policy
+    is created: the alphabet, the table that turns random bytes into characters, the character
+    sets every password must include and, in dictionary mode, the words that fit, grouped by length
+    (see PassphraseSampler). 'entropy_bits' estimates how unpredictable the passwords are.
+    Invalid rules raise ValueError right away. A policy can't be changed once it is created
+    (make a new one instead), so it can safely be kept and shared for as long as needed.
+    """
+    __slots__ = (
+        "length", "use_lowercase", "use_uppercase", "use_digits", "use_symbols", "symbols", "use_spaces", "use_dictionary",
+        "alphabet", "required_types", "character_sampler",
+        "words", "max_words_length", "guaranteed_types", "guaranteed_samplers", "passphrase_sampler", "entropy_bits",
+    )
+
+    def __init__(self, length=16, use_lowercase=True, use_uppercase=True, use_digits=True, use_symbols=True,
+                 custom_symbols_set=None, use_spaces=False, use_dictionary=False, dictionary_words=None):
+        if length <= 0:
+            raise ValueError("Password length must be a positive integer.")
+        symbols = (custom_symbols_set or DEFAULT_SYMBOLS) if use_symbols else ''
+        fields = {
+            "length": length, "use_lowercase": use_lowercase, "use_uppercase": use_uppercase, "use_digits": use_digits,
+            "use_symbols": use_symbols, "symbols": symbols, "use_spaces": use_spaces, "use_dictionary": use_dictionary,
+            "words": (), "max_words_length": 0, "guaranteed_types": (), "guaranteed_samplers": (), "passphrase_sampler": None,
+        }
+
+        if use_dictionary:
+            if not use_lowercase and not use_uppercase:
+                raise ValueError("Dictionary mode inherently requires letters. Cannot exclude both lowercase and uppercase.")
+            # In dictionary mode the random filler characters come from every selected type,
+            # and one digit, symbol and space (if selected) are always added between the words.
+            alphabet, _ = build_alphabet(use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces)
+            guaranteed_types = tuple(chars for used, chars in ((use_digits, string.digits), (use_symbols, symbols), (use_spaces, ' ')) if used)
+            max_words_length = length - len(guaranteed_types)
+            if max_words_length < 1:
+                raise ValueError(f"Password length ({length}) is insufficient to accommodate dictionary words and required character types. Minimum for dictionary mode: {len(guaranteed_types) + 1}.")
+            all_words = dictionary_words if dictionary_words else load_builtin_words()
+            if not all_words:
+                raise ValueError("No words available for dictionary password generation. Verify dictionary file or internal lists.")
+            # Words longer than the space left for words could never be used, so they are left out here once,
+            # together with repeated words (which would be picked more often than the others).
+            if isinstance(all_words, WordList):
+                words = all_words.up_to_length(max_words_length) # Already free of repeats, and sorted by length.
+            else:
+                words = tuple(dict.fromkeys(word for word in all_words if len(word) <= max_words_length))
+            if not words:
+                raise ValueError(f"Every dictionary word exceeds the desired password length ({length}) when accounting for other required characters.")
+            if isinstance(words, WordList):
+                words_by_length = {n: words.of_length(n) for n in range(1, max_words_length + 1)}
+            else:
+                words_by_length = {}
+                for word in words:
+                    words_by_length.setdefault(len(word), []).append(word)
+            sampler = PassphraseSampler(words_by_length, max_words_length)
+            # The words fill their whole budget whenever possible; any space left goes to random characters.
+            filler_count = max_words_length - sampler.target
+            fields.update(
+                words=words, max_words_length=max_words_length, guaranteed_types=guaranteed_types, passphrase_sampler=sampler,
+                guaranteed_samplers=tuple(CharacterSampler(chars) for chars in guaranteed_types),
+                entropy_bits=math.log2(sampler.combinations)
+                    + (sampler.target if use_lowercase and use_uppercase else 0) # Every letter's case is random.
+                    + sum(math.log2(len(set(chars))) for chars in guaranteed_types)
+                    + filler_count * math.log2(len(alphabet)),
+            )
+            required_types = []
+        else:
+            alphabet, required_types = build_alphabet(use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces)
+            if not alphabet:
+                raise ValueError("No character types selected. Cannot generate password.")
+            if length < len(required_types):
+                raise ValueError(f"Password length ({length}) is too short to include all {len(required_types)} selected character types.")
+            # Counts the passwords that include every required type: all possible strings, minus the ones
+            # missing some type, corrected for those missing several ("inclusion-exclusion").
+            # This is done with the share of valid passwords, in floating point: exact whole numbers with
+            # 'length' digits would make very long passwords slow to set up.
+            size = len(alphabet)
+            share = 0.0
+            for n in range(len(required_types) + 1):
+                for missing in itertools.combinations(required_types, n):
+                    share += (-1) ** n * ((size - len(frozenset().union(*missing))) / size) ** length
+            if share > 1e-9:
+                fields["entropy_bits"] = length * math.log2(size) + math.log2(share)
+            else:
+                # Only short passwords get such a small share, and for them the exact count is cheap and avoids rounding errors.
+                valid = 0
+                for n in range(len(required_types) + 1):
+                    for missing in itertools.combinations(required_types, n):
+                        valid += (-1) ** n * (size - len(frozenset().union(*missing))) ** length
+                fields["entropy_bits"] = math.log2(valid)
+
+        fields.update(alphabet=alphabet, required_types=tuple(required_types), character_sampler=CharacterSampler(alphabet))
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("A PasswordPolicy can't be changed. Create a new one instead.")
+
+    def __delattr__(self, name):
+        raise AttributeError("A PasswordPolicy can't be changed. Create a new one instead.")
+
+    # A policy is sent to worker processes by pickling it, and rebuilt there without calling __setattr__.
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def random_characters(self, count):
+        """Returns a string of 'count' characters, each picked uniformly at random from the alphabet (see CharacterSampler)."""
+        return self.character_sampler.sample(count)
+
+    def generate(self):
+        """Returns one new password that follows the policy."""
+        if self.use_dictionary:
+            return next(self._generate_passphrases(1))
+        while True:
+            password = self.random_characters(self.length)
+            if all(not chars.isdisjoint(password) for chars in self.required_types):
+                return password
+
+    def generate_many(self, count, batch_size=BULK_BATCH_SIZE):
+        """
+        Generates 'count' passwords quickly, yielding them one at a time so they can be written out
+        as they are made (without keeping them all in memory).
+
+        In the normal (non-dictionary) mode, the characters for a whole batch of passwords are drawn
+        at once with random_characters(), and passwords missing one of the selected character types
+        are thrown away and replaced, so every valid password is equally likely.
+        """
+        if self.use_dictionary:
+            yield from self._generate_passphrases(count, batch_size)
+            return
+        length = self.length
+        remaining = count
+        while remaining > 0:
+            batch = min(batch_size, remaining)
+            characters = self.random_characters(batch * length)
+            passwords = [characters[start:start + length] for start in range(0, len(characters), length)]
+            for chars in self.required_types:
+                # Keep only the passwords that contain at least one character of this type.
+                passwords = [password for password in passwords if not chars.isdisjoint(password)]
+            del passwords[remaining:]
+            remaining -= len(passwords)
+            yield from passwords
+
+    def _generate_passphrases(self, count, batch_size=BULK_BATCH_SIZE):
+        """
+        Builds dictionary-mode passwords a batch at a time: words that fill their space exactly
+        (see PassphraseSampler) with random letter case, the guaranteed digit/symbol/space and any
+        random filler characters, all put in a random order.
+
+        The random parts are drawn for the whole batch at once: the letter case of every word in
+        one go (see mix_letter_case()), the guaranteed and filler characters as one string per type,
+        and the other random numbers from a RandomBuffer, so a passphrase costs about as much as a
+        normal password.
+        """
+        rng = RandomBuffer()
+        sampler = self.passphrase_sampler
+        filler_count = self.max_words_length - sampler.target
+        remaining = count
+        while remaining > 0:
+            batch = min(batch_size, remaining)
+            remaining -= batch
+            chosen = [sampler.sample(rng.randbelow) for _ in range(batch)]
+            words = [word for password_words in chosen for word in password_words]
+            if self.use_lowercase and self.use_uppercase:
+                words = mix_letter_case(words)
+            elif self.use_lowercase:
+                words = [change_case(word, False) for word in words]
+            else:
+                words = [change_case(word, True) for word in words]
+            guaranteed = [guaranteed_sampler.sample(batch) for guaranteed_sampler in self.guaranteed_samplers]
+            filler = self.random_characters(batch * filler_count)
+
+            position = 0
+            for i, password_words in enumerate(chosen):
+                parts = words[position:position + len(password_words)]
+                position += len(password_words)
+                parts.extend(chars[i] for chars in guaranteed)
+                parts.extend(filler[i * filler_count:(i + 1) * filler_count])
+                # Words move as whole pieces, so they are never split; the length is exact, so nothing is cut.
+                rng.shuffle(parts)
+                yield ''.join(parts)
+
 def generate_password(length, use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces, use_dictionary, dictionary_words):
     """
-    This function constitutes the core logic for password generation. It processes all
-    specified parameters (e.g., desired length, character types, dictionary mode)
-    to construct a secure and random password conforming to the defined criteria.
+    Generates a single password from the given settings.
+    Every call prepares the rules from scratch: programs that make many passwords should create
+    a PasswordPolicy once and call its generate() or generate_many() instead.
 
     Parameters:
         length (int): The target length of the generated password.
@@ -174,143 +770,551 @@ def generate_password(length, use_lowercase, use_uppercase, use_digits, use_symb
     Returns:
         str: The generated password or an error message if generation fails.
     """
-    password_parts = [] # A list to accumulate characters and word segments.
-    available_chars_for_random = [] # The pool of characters from which random fillers are drawn.
-    guaranteed_chars = [] # Characters that must be present (e.g., at least one digit if requested).
-    
-    # Determines the set of symbols to be used.
-    final_symbols_to_use = DEFAULT_SYMBOLS
-    if use_symbols and custom_symbols_set:
-        final_symbols_to_use = custom_symbols_set
-    elif not use_symbols and custom_symbols_set:
+    if not use_symbols and custom_symbols_set:
         # Warns if custom symbols are provided but symbol inclusion is disabled.
         print("Warning: Custom symbols were provided, but symbol inclusion was disabled. Symbols will be excluded.", file=sys.stderr)
-        use_symbols = False # Ensures symbols are not used.
-
-    # --- Dictionary Mode Password Generation ---
-    if use_dictionary:
-        # Selects the word source: custom file words or internal default lists.
-        all_words_for_dictionary = dictionary_words if dictionary_words else (ITALIAN_WORDS + ENGLISH_WORDS)
-        if not all_words_for_dictionary:
-            return "Error: No words available for dictionary password generation. Verify dictionary file or internal lists."
-
-        # Validates that at least one letter case is enabled for dictionary mode.
-        if not use_lowercase and not use_uppercase:
-            return "Error: Dictionary mode inherently requires letters. Cannot exclude both lowercase and uppercase."
-
-        # Calculates the minimum length required for non-word characters.
-        min_non_word_chars_len = 0
-        if use_digits: min_non_word_chars_len += 1
-        if use_symbols: min_non_word_chars_len += 1
-        if use_spaces: min_non_word_chars_len += 1
-
-        # Determines the maximum allowable length for dictionary words, reserving space for other character types.
-        max_word_length_allowed = length - min_non_word_chars_len
-        if max_word_length_allowed < 1:
-             return f"Error: Password length ({length}) is insufficient to accommodate dictionary words and required character types. Minimum for dictionary mode: {min_non_word_chars_len + 1}."
-
-        chosen_words = []
-        current_words_len = 0
-
-        # Iteratively selects words, aiming for a total word length within the allowed limit
-        # and a reasonable number of words (e.g., up to 5).
-        attempts = 0
-        while current_words_len < max_word_length_allowed * 0.8 and len(chosen_words) < 5 and attempts < 10:
-            word_candidate = random.choice(all_words_for_dictionary)
-            if current_words_len + len(word_candidate) <= max_word_length_allowed:
-                chosen_words.append(word_candidate)
-                current_words_len += len(word_candidate)
-            attempts += 1
-        
-        # Ensures at least one word is included if possible.
-        if not chosen_words and all_words_for_dictionary:
-            word = random.choice(all_words_for_dictionary)
-            if len(word) > max_word_length_allowed:
-                 return f"Error: A single dictionary word '{word}' exceeds the desired password length ({length}) when accounting for other required characters."
-            chosen_words.append(word)
-            current_words_len += len(word)
-
-        # Processes each chosen word, applying random casing to letters.
-        for word in chosen_words:
-            processed_word = ""
-            for char in word:
-                if char.isalpha():
-                    if use_lowercase and use_uppercase:
-                        processed_word += random.choice([char.lower(), char.upper()])
-                    elif use_lowercase:
-                        processed_word += char.lower()
-                    elif use_uppercase:
-                        processed_word += char.upper()
+    try:
+        policy = PasswordPolicy(length, use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces, use_dictionary, dictionary_words)
+    except ValueError as e:
+        return f"Error: {e}"
+    return policy.generate()
+
+
+# --- Bulk Password Generation ---
+def generate_passwords(count, length, use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces, use_dictionary=False, dictionary_words=None, batch_size=BULK_BATCH_SIZE):
+    """
+    Generates many passwords quickly with the same options as generate_password(),
+    yielding them one at a time (see PasswordPolicy.generate_many()).
+    Raises ValueError if the options make it impossible to generate a password.
+    """
+    policy = PasswordPolicy(length, use_lowercase, use_uppercase, use_digits, use_symbols, custom_symbols_set, use_spaces, use_dictionary, dictionary_words)
+    return policy.generate_many(count, batch_size)
+
+def write_passwords(passwords, output, batch_size=BULK_BATCH_SIZE):
+    """Writes passwords to an open file, one per line, a batch at a time."""
+    batch = []
+    for password in passwords:
+        batch.append(password)
+        if len(batch) == batch_size:
+            output.write('\n'.join(batch) + '\n')
+            batch.clear()
+    if batch:
+        output.write('\n'.join(batch) + '\n')
+    output.flush()
+
+def generate_shard(policy, count, path):
+    """
+    Runs in a worker process: writes 'count' passwords from the policy to its own shard file.
+    Every process reads its random bytes directly from the operating system (os.urandom),
+    so no two workers ever share or repeat a random stream.
+    """
+    with open(path, 'w', encoding='utf-8') as shard:
+        write_passwords(policy.generate_many(count), shard)
+    return path
+
+def generate_parallel(policy, count, output, workers, temp_dir=None, unique=None):
+    """
+    Generates 'count' passwords with several worker processes and writes them, one per line,
+    to 'output' (a file opened in binary mode).
+
+    The work is split into shards of about the same size. Each shard is generated by a worker
+    into its own temporary file, and the shards are copied into the output in order as soon
+    as they are ready, so the result is complete and always contains exactly 'count' passwords.
+    'temp_dir' is where the shard files go (by default the system's temporary folder).
+    With a UniqueFilter, repeats are dropped while the shards are copied and replaced at the end.
+    """
+    written = 0
+    # Imported here rather than at the top: they take longer to load than the rest of the script,
+    # and only parallel runs need them.
+    import shutil # Copies the finished shards into the final output
+    import tempfile # A temporary folder for the shards
+    from concurrent.futures import ProcessPoolExecutor # Runs the generator on several CPU cores at once
+
+    shard_count = max(1, min(count, workers * SHARDS_PER_WORKER))
+    sizes = [count // shard_count + (1 if i < count % shard_count else 0) for i in range(shard_count)]
+    with tempfile.TemporaryDirectory(dir=temp_dir) as folder, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(generate_shard, policy, size, os.path.join(folder, f"shard{i}.txt"))
+            for i, size in enumerate(sizes)
+        ]
+        for future in futures:
+            with open(future.result(), 'rb') as shard:
+                if unique is None:
+                    shutil.copyfileobj(shard, output, 1024 * 1024)
                 else:
-                    processed_word += char
-            password_parts.append(processed_word)
-
-        # Populates the general character pool and identifies characters that must be guaranteed.
-        if use_digits:
-            available_chars_for_random.extend(list(string.digits))
-            guaranteed_chars.append(random.choice(string.digits))
-        if use_symbols:
-            available_chars_for_random.extend(list(final_symbols_to_use))
-            guaranteed_chars.append(random.choice(list(final_symbols_to_use)))
-        if use_spaces:
-            available_chars_for_random.append(' ')
-            guaranteed_chars.append(' ')
-        
-        if use_lowercase:
-            available_chars_for_random.extend(list(string.ascii_lowercase))
-        if use_uppercase:
-            available_chars_for_random.extend(list(string.ascii_uppercase))
-
-        # Distributes guaranteed characters among the password segments.
-        temp_password_string_parts = []
-        for i, part in enumerate(password_parts):
-            temp_password_string_parts.append(part)
-            if guaranteed_chars and i < len(password_parts) - 1:
-                temp_password_string_parts.append(guaranteed_chars.pop(0))
-        password_parts = temp_password_string_parts
-        password_parts.extend(guaranteed_chars) # Appends any remaining guaranteed characters.
-
-    else: # --- Standard Random Password Generation (Non-Dictionary Mode) ---
-        # Populates the character pool and identifies characters that must be guaranteed.
-        if use_lowercase:
-            available_chars_for_random.extend(list(string.ascii_lowercase))
-            guaranteed_chars.append(random.choice(string.ascii_lowercase))
-        if use_uppercase:
-            available_chars_for_random.extend(list(string.ascii_uppercase))
-            guaranteed_chars.append(random.choice(string.ascii_uppercase))
-        if use_digits:
-            available_chars_for_random.extend(list(string.digits))
-            guaranteed_chars.append(random.choice(string.digits))
-        if use_symbols:
-            available_chars_for_random.extend(list(final_symbols_to_use))
-            guaranteed_chars.append(random.choice(list(final_symbols_to_use)))
-        if use_spaces:
-            available_chars_for_random.append(' ')
-            guaranteed_chars.append(' ')
-        
-        # Initializes password parts with guaranteed characters.
-        password_parts.extend(guaranteed_chars)
-
-    # --- Final Password Assembly and Validation ---
-    if not available_chars_for_random:
-        return "Error: No character types selected. Cannot generate password."
-    
-    # Calculates the current length of the assembled password components.
-    current_length_so_far = sum(len(part) for part in password_parts)
+                    new_lines = [line for line in shard if unique.add(line[:-1].decode('utf-8'))]
+                    output.writelines(new_lines)
+                    written += len(new_lines)
+            os.remove(shard.name) # Frees the disk space as soon as the shard is copied.
+    if unique is not None and written < count:
+        replacements = unique.generate(policy, count - written)
+        output.write(''.join(password + '\n' for password in replacements).encode('utf-8'))
+    output.flush()
 
-    # Fills the remaining length of the password with random characters.
-    remaining_slots = length - current_length_so_far
-    
-    if remaining_slots > 0:
-        for _ in range(remaining_slots):
-            password_parts.append(random.choice(available_chars_for_random))
 
-    # Shuffles the entire list of password components to ensure high randomness and prevent patterns.
-    random.shuffle(password_parts)
+# --- Uniqueness Check ---
+class UniqueFilter:
+    """
+    Makes sure no password is produced twice in a bulk run, using a fixed amount of memory.
+
+    Keeping every password in a Python set would need around a hundred bytes per password.
+    Instead, this uses a Bloom filter: a large array of bits, where each password sets a few bits
+    chosen by its hash. If all the bits of a password are already set, it has (most likely) been
+    produced before and is thrown away and replaced ("regenerated"). A password that was really
+    produced before is always caught; occasionally a new one is mistaken for a repeat (with
+    probability error_rate once the filter is full), which only costs a replacement.
+
+    The filter is sized for 'capacity' passwords and the given error rate, which takes about
+    1.8 bytes per password at a 0.1% rate. 'max_bytes' puts a hard limit on its memory instead;
+    the error rate then grows (see expected_error_rate). 'collisions' counts the replaced passwords.
+    """
+    def __init__(self, capacity, error_rate=UNIQUE_ERROR_RATE, max_bytes=None):
+        capacity = max(1, capacity)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2) # Bits needed for that error rate.
+        if max_bytes is not None:
+            size = min(size, int(max_bytes * 8))
+        self.size = max(64, size)
+        # The number of bits per password that gives the lowest error rate for this size.
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.expected_error_rate = (1 - math.exp(-self.hash_count * capacity / self.size)) ** self.hash_count
+        self.bits = bytearray((self.size + 7) // 8)
+        self.key = os.urandom(16) # A secret hash key, so nobody can predict which passwords collide.
+        import hashlib # Only the uniqueness check needs it.
+        self.blake2b = hashlib.blake2b
+        self.collisions = 0
+
+    def add(self, password):
+        """Remembers a password. Returns True if it is new, or False (and counts a collision) if it was seen before."""
+        digest = self.blake2b(password.encode('utf-8'), digest_size=16, key=self.key).digest()
+        # Two independent numbers from the hash are combined to pick all the bits ("double hashing").
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        bits, size = self.bits, self.size
+        new = False
+        for i in range(self.hash_count):
+            position = (first + i * step) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        if not new:
+            self.collisions += 1
+        return new
+
+    def generate(self, policy, count):
+        """
+        Yields 'count' passwords from the policy that were never produced before, replacing repeats.
+        Raises ValueError if UNIQUE_MAX_STREAK repeats come in a row (the rules allow too few different passwords).
+        """
+        remaining = count
+        streak = 0
+        while remaining > 0:
+            for password in policy.generate_many(remaining):
+                if self.add(password):
+                    streak = 0
+                    remaining -= 1
+                    yield password
+                else:
+                    streak += 1
+                    if streak >= UNIQUE_MAX_STREAK:
+                        raise ValueError(f"{UNIQUE_MAX_STREAK} repeated passwords in a row: these rules can't produce enough different passwords. Try a longer length or a bigger dictionary.")
+
+
+# --- Strength Check (--check) ---
+# The characters of each type, and how many characters an attacker has to try for each one.
+CHARACTER_CLASSES = (
+    ("lower", frozenset(string.ascii_lowercase), 26),
+    ("upper", frozenset(string.ascii_uppercase), 26),
+    ("digits", frozenset(string.digits), 10),
+    ("symbols", frozenset(DEFAULT_SYMBOLS), len(DEFAULT_SYMBOLS)),
+    ("spaces", frozenset(' '), 1),
+)
+OTHER_CHARACTERS_SIZE = 100 # Accented letters and other characters outside the types above.
+
+class WordFinder:
+    """
+    Finds every dictionary word hidden inside a text, in a single pass over the text
+    (an Aho-Corasick automaton).
+
+    The words are stored letter by letter in a tree (a "trie"): each state is a prefix of some
+    word, and 'goto' tells which state follows when one more character is read. When the next
+    character doesn't continue any word, 'fail' jumps to the longest end of what was read so far
+    that is still the start of a word, so no character is ever read twice. 'ends' lists the
+    lengths of the words that finish in each state. The automaton is built once per word list
+    and then checks any number of passwords.
+    """
+    def __init__(self, words, min_length=CHECK_MIN_WORD_LENGTH):
+        goto = [{}]
+        lengths = [0] # The length of the prefix each state stands for.
+        is_word = [False]
+        for word in words:
+            if len(word) < min_length:
+                continue
+            state = 0
+            for char in change_case(word, False): # Lowered the same way as the passwords in check().
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    lengths.append(lengths[state] + 1)
+                    is_word.append(False)
+                state = next_state
+            is_word[state] = True
+
+        # The fail links are found level by level (shortest prefixes first), so a state's
+        # fail link and its word ends are always ready before the states below it need them.
+        fail = [0] * len(goto)
+        ends = [()] * len(goto)
+        level = list(goto[0].values())
+        while level:
+            next_level = []
+            for state in level:
+                if is_word[state]:
+                    ends[state] = (lengths[state],) + ends[fail[state]]
+                else:
+                    ends[state] = ends[fail[state]]
+                for char, child in goto[state].items():
+                    fallback = fail[state]
+                    while fallback and char not in goto[fallback]:
+                        fallback = fail[fallback]
+                    fail[child] = goto[fallback].get(char, 0) if state else 0
+                    next_level.append(child)
+            level = next_level
+        self.goto = goto
+        self.fail = fail
+        self.ends = ends
+        self.word_count = sum(is_word)
+
+    def find(self, text):
+        """Returns, for each position of the text, the lengths of the dictionary words ending at that character."""
+        goto, fail, ends = self.goto, self.fail, self.ends
+        state = 0
+        found = []
+        for char in text:
+            while True:
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            found.append(ends[state])
+        return found
+
+class StrengthChecker:
+    """
+    Rates passwords: which character types they use, which dictionary words they contain,
+    and how many guesses an attacker who knows the word list would need (the entropy, in bits).
+
+    The entropy is the cheapest way to "spell" the password: every character costs the bits of
+    guessing it among the character types in use, while a whole dictionary word costs only the bits
+    of picking it from the word list (plus a bit if its case or letters were changed). A password
+    made of dictionary words therefore scores far lower than its length suggests.
+    """
+    def __init__(self, words):
+        self.finder = WordFinder(words)
+        self.word_bits = math.log2(max(self.finder.word_count, 2))
+
+    def check(self, password):
+        """Returns (entropy in bits, strength level 0-4, the character types used, the dictionary words found)."""
+        characters = set(password)
+        classes = []
+        alphabet_size = 0
+        for name, chars, size in CHARACTER_CLASSES:
+            if not characters.isdisjoint(chars):
+                classes.append(name)
+                alphabet_size += size
+                characters -= chars
+        if characters:
+            classes.append("other")
+            alphabet_size += OTHER_CHARACTERS_SIZE
+        char_bits = math.log2(max(alphabet_size, 2))
+
+        # change_case() keeps the length (plain 'İ'.lower() is two characters), so plain[i] stays password[i].
+        plain = change_case(password, False).translate(LEET_TABLE)
+        found = self.finder.find(plain)
+        if not any(found): # No dictionary word at all: every character is simply guessed.
+            entropy = len(password) * char_bits
+            level = next(n for n, (limit, _) in enumerate(STRENGTH_LEVELS) if entropy < limit)
+            return entropy, level, classes, []
+
+        # cost[i]: the fewest bits needed for the first i characters; start[i]: where the last word began (or -1).
+        cost = [0.0]
+        start = [-1]
+        for i, word_ends in enumerate(found, 1):
+            best = cost[i - 1] + char_bits
+            best_start = -1
+            for length in word_ends:
+                j = i - length
+                bits = cost[j] + self.word_bits
+                if password[j:i] != plain[j:i]: # Changed case or look-alike characters: a little harder to guess.
+                    bits += 1
+                if bits < best:
+                    best = bits
+                    best_start = j
+            cost.append(best)
+            start.append(best_start)
+
+        words = []
+        i = len(password)
+        while i > 0:
+            if start[i] >= 0:
+                words.append(plain[start[i]:i])
+                i = start[i]
+            else:
+                i -= 1
+        words.reverse()
+        entropy = cost[-1]
+        level = next(n for n, (limit, _) in enumerate(STRENGTH_LEVELS) if entropy < limit)
+        return entropy, level, classes, words
+
+def check_passwords(checker, lines, output):
+    """
+    Checks every password (one per line) and writes one result line per password to 'output':
+    line number, strength level (0-4), entropy in bits, length, character types and dictionary words.
+    The passwords themselves are not repeated in the report. Lines are read and written a batch
+    at a time, so files of any size can be checked. Returns a dictionary with the totals.
+    """
+    summary = {"checked": 0, "entropy_total": 0.0, "with_words": 0,
+               "levels": [0] * len(STRENGTH_LEVELS), "classes": dict.fromkeys([name for name, _, _ in CHARACTER_CLASSES] + ["other"], 0)}
+    levels = summary["levels"]
+    class_counts = summary["classes"]
+    batch = ["# line\tlevel\tbits\tlength\ttypes\twords"]
+    for number, line in enumerate(lines, 1):
+        password = line.rstrip('\r\n')
+        if not password:
+            continue
+        entropy, level, classes, words = checker.check(password)
+        summary["checked"] += 1
+        summary["entropy_total"] += entropy
+        levels[level] += 1
+        for name in classes:
+            class_counts[name] += 1
+        if words:
+            summary["with_words"] += 1
+        batch.append(f"{number}\t{level}\t{entropy:.1f}\t{len(password)}\t{','.join(classes)}\t{' '.join(words)}")
+        if len(batch) >= BULK_BATCH_SIZE:
+            output.write('\n'.join(batch) + '\n')
+            batch.clear()
+    if batch:
+        output.write('\n'.join(batch) + '\n')
+    output.flush()
+    return summary
+
+def print_check_summary(summary, file=sys.stderr):
+    """Prints the totals of a --check run."""
+    checked = summary["checked"]
+    print(f"Checked {checked} password(s).", file=file)
+    if not checked:
+        return
+    print(f"Average entropy: {summary['entropy_total'] / checked:.1f} bits. "
+          f"Containing dictionary words: {summary['with_words']} ({100 * summary['with_words'] / checked:.1f}%).", file=file)
+    for n, (count, (_, name)) in enumerate(zip(summary["levels"], STRENGTH_LEVELS)):
+        print(f"  {n} {name:<12}{count:>10} ({100 * count / checked:.1f}%)", file=file)
+    print("Character types: " + ", ".join(f"{name} {100 * count / checked:.0f}%" for name, count in summary["classes"].items()), file=file)
+
+
+# --- Password Server (--serve) ---
+class PasswordPool:
+    """
+    Keeps up to 'size' ready-made passwords for one PasswordPolicy.
+
+    A background thread tops the pool up whenever passwords are taken, so a request normally just
+    takes passwords that already exist. If the pool runs dry (for example with a very large batch),
+    the missing passwords are generated on the spot: a request is never refused or kept waiting
+    for the refill. Every password is handed out only once.
+    """
+    def __init__(self, policy, size=POOL_SIZE):
+        import threading # Only the server needs these.
+        from collections import deque
+        self.policy = policy
+        self.size = size
+        self.passwords = deque()
+        self.served = 0
+        self.generated_on_demand = 0
+        self.lock = threading.Lock() # Protects the counters.
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self._refill, daemon=True)
+        self.thread.start()
+
+    def _refill(self):
+        """Runs in the background thread: generates passwords until the pool is full, then sleeps until some are taken."""
+        while True:
+            missing = self.size - len(self.passwords)
+            if missing > 0:
+                self.passwords.extend(self.policy.generate_many(min(missing, POOL_REFILL_BATCH)))
+            else:
+                self.wake.clear()
+                if len(self.passwords) >= self.size: # Checked again, in case passwords were taken meanwhile.
+                    self.wake.wait()
+
+    def take(self, count):
+        """Returns a list of 'count' passwords, taken from the pool as far as possible."""
+        passwords = []
+        try:
+            for _ in range(count):
+                passwords.append(self.passwords.popleft())
+        except IndexError: # The pool is empty.
+            pass
+        missing = count - len(passwords)
+        if missing:
+            passwords.extend(self.policy.generate_many(missing))
+        with self.lock:
+            self.served += count
+            self.generated_on_demand += missing
+        self.wake.set()
+        return passwords
+
+    def status(self):
+        """The numbers shown by /status for this pool."""
+        return {"depth": len(self.passwords), "size": self.size, "served": self.served, "generated_on_demand": self.generated_on_demand}
+
+# The options a request can give, with the PasswordPolicy setting each one changes.
+SERVE_OPTIONS = {
+    "length": "length",
+    "lowercase": "use_lowercase",
+    "uppercase": "use_uppercase",
+    "digits": "use_digits",
+    "symbols": "use_symbols",
+    "custom_symbols": "custom_symbols_set",
+    "spaces": "use_spaces",
+    "dictionary": "use_dictionary",
+}
+
+def parse_serve_request(query, defaults):
+    """
+    Turns the options of a request (e.g. 'length=20&symbols=0&count=5') into PasswordPolicy settings
+    and a number of passwords. Options that are not given keep the server's defaults.
+    Raises ValueError with a readable message for anything wrong.
+    """
+    from urllib.parse import parse_qsl # Only the server needs it.
+    settings = dict(defaults)
+    count = 1
+    output_format = "text"
+    for name, value in parse_qsl(query, keep_blank_values=True, strict_parsing=bool(query)):
+        if name == "count":
+            count = parse_integer(name, value)
+            if not 1 <= count <= SERVE_MAX_COUNT:
+                raise ValueError(f"count must be between 1 and {SERVE_MAX_COUNT}.")
+        elif name == "format":
+            if value not in ("text", "json"):
+                raise ValueError("format must be 'text' or 'json'.")
+            output_format = value
+        elif name == "length":
+            settings["length"] = parse_integer(name, value)
+            if settings["length"] > SERVE_MAX_LENGTH:
+                raise ValueError(f"length can be at most {SERVE_MAX_LENGTH}.")
+        elif name == "custom_symbols":
+            settings["custom_symbols_set"] = value or None
+        elif name in SERVE_OPTIONS:
+            if value.lower() in ("1", "true", "yes", "on"):
+                settings[SERVE_OPTIONS[name]] = True
+            elif value.lower() in ("0", "false", "no", "off"):
+                settings[SERVE_OPTIONS[name]] = False
+            else:
+                raise ValueError(f"{name} must be 1 or 0.")
+        else:
+            raise ValueError(f"Unknown option '{name}'.")
+    return settings, count, output_format
+
+def parse_integer(name, value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number.") from None
+
+class PasswordService:
+    """
+    Everything the server needs between requests: the dictionary, loaded once at start-up, and one
+    PasswordPool for each different set of rules that has been asked for (created the first time).
+    """
+    def __init__(self, defaults, dictionary_words=None, pool_size=POOL_SIZE):
+        self.defaults = defaults
+        self.dictionary_words = dictionary_words
+        self.pool_size = pool_size
+        self.pools = {}
+        import threading # Only the server needs it.
+        self.lock = threading.Lock()
+
+    def pool_for(self, settings):
+        """Returns the pool for these PasswordPolicy settings. Raises ValueError if the rules are invalid."""
+        key = tuple(sorted(settings.items()))
+        pool = self.pools.get(key)
+        if pool is not None:
+            return pool
+        if len(self.pools) >= SERVE_MAX_POLICIES:
+            raise ValueError(f"Too many different password rules in use (at most {SERVE_MAX_POLICIES}).")
+        # The policy is prepared without holding the lock, so a slow one never holds up other requests.
+        policy = PasswordPolicy(dictionary_words=self.dictionary_words, **settings)
+        with self.lock:
+            pool = self.pools.get(key) # Another request may have created it meanwhile.
+            if pool is None:
+                if len(self.pools) >= SERVE_MAX_POLICIES:
+                    raise ValueError(f"Too many different password rules in use (at most {SERVE_MAX_POLICIES}).")
+                pool = self.pools.setdefault(key, PasswordPool(policy, self.pool_size))
+        return pool
+
+    def status(self):
+        """The /status report: the rules and the state of every pool."""
+        with self.lock:
+            pools = list(self.pools.items())
+        return {"pools": [dict(policy=dict(key), **pool.status()) for key, pool in pools]}
+
+def serve(service, port):
+    """
+    Runs the password server on SERVE_HOST:port until it is stopped with Ctrl+C.
+
+      GET /password  - one password as plain text. Options: count=N (a batch, one password per line),
+                       format=json, length=N (up to SERVE_MAX_LENGTH), lowercase/uppercase/digits/symbols/spaces/dictionary=1 or 0,
+                       custom_symbols=...
+      GET /status    - the depth of every pool and how many passwords it has served, as JSON.
+    """
+    import http.server # Only the server needs these.
+    import json
+
+    class PasswordRequestHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keeps the connection open, so clients can send many requests quickly.
+        disable_nagle_algorithm = True # Sends each answer at once instead of waiting to fill a network packet.
 
-    # Joins all components into a single string and truncates it to the exact desired length.
-    final_password = ''.join(password_parts)[:length]
-    return final_password
+        def do_GET(self):
+            path, _, query = self.path.partition('?')
+            if path == "/status":
+                self.send_body(200, json.dumps(service.status()), "application/json")
+            elif path == "/password":
+                try:
+                    settings, count, output_format = parse_serve_request(query, service.defaults)
+                    passwords = service.pool_for(settings).take(count)
+                except ValueError as e:
+                    self.send_body(400, f"Error: {e}\n")
+                    return
+                if output_format == "json":
+                    self.send_body(200, json.dumps({"passwords": passwords}), "application/json")
+                else:
+                    self.send_body(200, '\n'.join(passwords) + '\n')
+            else:
+                self.send_body(404, "Error: Unknown address. Use /password or /status.\n")
+
+        def send_body(self, status, text, content_type="text/plain"):
+            body = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store") # Passwords must never be kept in a cache.
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Requests are not printed, so nothing about the issued passwords ends up in logs.
+
+    with http.server.ThreadingHTTPServer((SERVE_HOST, port), PasswordRequestHandler) as server:
+        host, port = server.server_address[:2]
+        print(f"Serving passwords on http://{host}:{port}/password (status: /status). Press Ctrl+C to stop.", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
 
 
 # --- Main Program Execution Block ---
@@ -333,7 +1337,7 @@ def main():
         "-l", "--length",
         type=int, # Expects an integer value.
         default=16, # Default length if not specified.
-        help="The desired length of the password (default: 16). For dictionary mode, this is a minimum target."
+        help="The exact length of the password (default: 16), in dictionary mode too."
     )
     # --no-lowercase: Excludes lowercase letters.
     parser.add_argument(
@@ -383,6 +1387,68 @@ def main():
         type=str, # Expects a file path string.
         help="Path to a custom dictionary file (words within should be comma-separated). \n(Requires the --dictionary flag to be active.)"
     )
+    # -n or --count: Generates many passwords at once (bulk mode).
+    parser.add_argument(
+        "-n", "--count",
+        type=int,
+        help="Generate this many passwords, one per line, without the 'Generated Password:' label. \n(Much faster than running the script once per password.)"
+    )
+    # -o or --output: Writes the passwords to a file.
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        help="Write the passwords to this file instead of the screen (the file is overwritten)."
+    )
+    # -w or --workers: Spreads bulk generation over several processes.
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Number of processes generating passwords at the same time in bulk mode (default: 1). \nUse 0 for one per CPU core. (Requires --count.)"
+    )
+    # --unique: Guarantees that no password is repeated in bulk mode.
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="Make sure no password appears twice in the output; repeats are replaced by new passwords. \n(Requires --count. Uses about 2 bytes of memory per password.)"
+    )
+    # --unique-memory: Limits the memory used by --unique.
+    parser.add_argument(
+        "--unique-memory",
+        type=float,
+        metavar="MB",
+        help="Maximum memory for the --unique check, in megabytes. A smaller limit means more new passwords \nare mistaken for repeats and replaced, but never lets a repeat through."
+    )
+    # --unique-error: The false-positive rate of the --unique check.
+    parser.add_argument(
+        "--unique-error",
+        type=float,
+        default=UNIQUE_ERROR_RATE,
+        metavar="RATE",
+        help=f"Chance that --unique mistakes a new password for a repeat (default: {UNIQUE_ERROR_RATE})."
+    )
+    # --serve: Runs as a local password server.
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help=f"Keep running as a password server on http://{SERVE_HOST}:PORT (only reachable from this computer). \nThe other options become the default rules; see README.md for the requests it accepts."
+    )
+    # --pool-size: How many passwords the server keeps ready.
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=POOL_SIZE,
+        help=f"Passwords the server keeps ready in advance for each set of rules (default: {POOL_SIZE}). (Requires --serve.)"
+    )
+
+    # --check: Rates existing passwords instead of generating new ones.
+    parser.add_argument(
+        "--check",
+        type=str,
+        metavar="FILE",
+        help="Check the strength of the passwords in FILE (one per line, '-' to read them from the keyboard/a pipe). \nLooks for dictionary words (from --dictionary-file, or the internal lists) and reports one line per password, \nthen a summary. Use -o to write the report to a file."
+    )
 
     # Parses the command-line arguments provided by the user.
     args = parser.parse_args()
@@ -400,7 +1466,7 @@ def main():
     # Attempts to load words from a custom dictionary file if specified.
     dict_words_for_use = []
     if args.dictionary_file:
-        if not args.dictionary:
+        if not args.dictionary and args.check is None:
             print("Error: The --dictionary-file argument requires the --dictionary flag to be enabled.", file=sys.stderr)
             sys.exit(1)
         dict_words_for_use = load_words_from_file(args.dictionary_file)
@@ -430,21 +1496,118 @@ def main():
         print("Error: Password length must be a positive integer.", file=sys.stderr)
         sys.exit(1)
 
-    # Invokes the password generation function with the determined parameters.
-    password = generate_password(
-        args.length,
-        use_lowercase,
-        use_uppercase,
-        use_digits,
-        use_symbols,
-        final_custom_symbols,
-        use_spaces,
-        use_dictionary,
-        dict_words_for_use
-    )
+    if args.count is not None and args.count <= 0:
+        print("Error: --count must be a positive integer.", file=sys.stderr)
+        sys.exit(1)
+    if args.workers < 0:
+        print("Error: --workers can't be negative.", file=sys.stderr)
+        sys.exit(1)
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1 and args.count is None:
+        print("Error: The --workers argument requires --count.", file=sys.stderr)
+        sys.exit(1)
+    if (args.unique or args.unique_memory is not None) and args.count is None:
+        print("Error: The --unique and --unique-memory arguments require --count.", file=sys.stderr)
+        sys.exit(1)
+    if not 0 < args.unique_error < 1 or (args.unique_memory is not None and args.unique_memory <= 0):
+        print("Error: --unique-error must be between 0 and 1, and --unique-memory must be positive.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.serve is not None and (args.count is not None or args.output or workers > 1 or args.unique):
+        print("Error: --serve can't be combined with --count, --output, --workers or --unique.", file=sys.stderr)
+        sys.exit(1)
+    if args.pool_size <= 0:
+        print("Error: --pool-size must be a positive integer.", file=sys.stderr)
+        sys.exit(1)
+
+    # Check mode: the word list is turned into a WordFinder once, then every password is read, rated and forgotten.
+    if args.check is not None:
+        if args.count is not None or args.serve is not None or workers > 1 or args.unique:
+            print("Error: --check can't be combined with --count, --serve, --workers or --unique.", file=sys.stderr)
+            sys.exit(1)
+        checker = StrengthChecker(dict_words_for_use or load_builtin_words())
+        try:
+            source = sys.stdin if args.check == '-' else open(args.check, 'r', encoding='utf-8', errors='replace')
+            with source:
+                if args.output:
+                    with open(args.output, 'w', encoding='utf-8') as output:
+                        summary = check_passwords(checker, source, output)
+                else:
+                    summary = check_passwords(checker, source, sys.stdout)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print_check_summary(summary)
+        return
+
+    # Checks and prepares the password rules once, whatever the number of passwords.
+    try:
+        policy = PasswordPolicy(
+            args.length,
+            use_lowercase,
+            use_uppercase,
+            use_digits,
+            use_symbols,
+            final_custom_symbols,
+            use_spaces,
+            use_dictionary,
+            dict_words_for_use
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Server mode: the rules and the dictionary are loaded once and reused for every request.
+    if args.serve is not None:
+        defaults = {
+            "length": args.length, "use_lowercase": use_lowercase, "use_uppercase": use_uppercase,
+            "use_digits": use_digits, "use_symbols": use_symbols, "custom_symbols_set": final_custom_symbols,
+            "use_spaces": use_spaces, "use_dictionary": use_dictionary,
+        }
+        service = PasswordService(defaults, dict_words_for_use, args.pool_size)
+        service.pool_for(defaults) # Starts filling the default pool right away.
+        try:
+            serve(service, args.serve)
+        except OSError as e:
+            print(f"Error starting the server: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    # Bulk mode: passwords are written out while they are being generated.
+    if args.count is not None or args.output:
+        count = args.count or 1
+        unique = None
+        if args.unique or args.unique_memory is not None:
+            max_bytes = args.unique_memory * 1000000 if args.unique_memory is not None else None
+            unique = UniqueFilter(count, args.unique_error, max_bytes)
+        passwords = unique.generate(policy, count) if unique is not None else policy.generate_many(count)
+        try:
+            if workers > 1:
+                if args.output:
+                    with open(args.output, 'wb') as output:
+                        # The shards are kept next to the output file, on the same disk.
+                        generate_parallel(policy, count, output, workers, os.path.dirname(os.path.abspath(args.output)), unique)
+                else:
+                    sys.stdout.flush()
+                    generate_parallel(policy, count, sys.stdout.buffer, workers, unique=unique)
+            elif args.output:
+                with open(args.output, 'w', encoding='utf-8') as output:
+                    write_passwords(passwords, output)
+            else:
+                write_passwords(passwords, sys.stdout)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        except OSError as e:
+            print(f"Error writing passwords: {e}", file=sys.stderr)
+            sys.exit(1)
+        if unique is not None:
+            print(f"Uniqueness check: {unique.collisions} repeated password(s) found and replaced "
+                  f"(filter: {len(unique.bits) / 1000000:.1f} MB, expected false-positive rate {unique.expected_error_rate:.2g}).", file=sys.stderr)
+        return
 
     # Displays the generated password to the user.
-    print(f"Generated Password: {password}")
+    print(f"Generated Password: {policy.generate()}")
 
 # Ensures that the 'main()' function is executed only when the script is run directly.
 if __name__ == "__main__":
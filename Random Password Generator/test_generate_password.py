@@ -0,0 +1,129 @@
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import generate_password
+
+from generate_password import (PassphraseSampler, PasswordPolicy, StrengthChecker, UniqueFilter, change_case,
+                               mix_letter_case)
+
+
+class WordIndexTest(unittest.TestCase):
+    """The saved index of a word file must be used while the file is unchanged, and rebuilt when it changes."""
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "words.txt")
+        cache = os.path.join(folder.name, "cache")
+        patcher = mock.patch.dict(os.environ, {"PASSWORD_GENERATOR_CACHE": cache})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        generate_password.word_index_folder_cache = None # Look for the folder again, in the new place.
+        self.addCleanup(setattr, generate_password, "word_index_folder_cache", None)
+
+    def write(self, text, mtime):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.utime(self.path, (mtime, mtime))
+
+    def load(self, from_index):
+        """Loads the word file, checking that it was (or wasn't) loaded from the saved index."""
+        with mock.patch.object(generate_password, "read_word_file", wraps=generate_password.read_word_file) as read:
+            words = list(generate_password.load_word_list(self.path))
+        self.assertEqual(read.called, not from_index)
+        return words
+
+    def test_index_is_reused_and_invalidated(self):
+        self.write("Trovare,usare,trovare\n11111 abaco\n", 1_000_000)
+        self.assertEqual(self.load(from_index=False), ["usare", "abaco", "trovare"]) # No repeats, shortest first.
+        self.assertTrue(os.listdir(os.environ["PASSWORD_GENERATOR_CACHE"]))
+        self.assertEqual(self.load(from_index=True), ["usare", "abaco", "trovare"])
+
+        os.utime(self.path, (2_000_000, 2_000_000)) # Only the time changed (e.g. a copy): the hash still matches.
+        self.assertEqual(self.load(from_index=True), ["usare", "abaco", "trovare"])
+
+        self.write("Trovare,usare,trovare\n11111 abete\n", 3_000_000) # Same size, different words.
+        self.assertEqual(self.load(from_index=False), ["usare", "abete", "trovare"])
+
+        self.write("sentire\n", 3_000_000) # Different size, same time.
+        self.assertEqual(self.load(from_index=False), ["sentire"])
+        self.assertEqual(self.load(from_index=True), ["sentire"])
+
+
+class LetterCaseTest(unittest.TestCase):
+    """Changing the case of a word must never change its length (e.g. 'ß'.upper() is 'SS')."""
+
+    def test_mix_letter_case_keeps_length(self):
+        words = ["straße", "groß", "città"] * 200
+        mixed = mix_letter_case(words)
+        self.assertEqual([len(word) for word in mixed], [len(word) for word in words])
+        self.assertTrue(all(word[-1] == "ß" for word in mixed[1::3]))
+
+    def test_change_case_keeps_length(self):
+        self.assertEqual(change_case("straße", True), "STRAßE")
+        self.assertEqual(change_case("STRAßE", False), "straße")
+
+    def test_dictionary_password_has_exact_length(self):
+        for options in ({}, {"use_lowercase": False}, {"use_uppercase": False}):
+            with self.subTest(**options):
+                policy = PasswordPolicy(10, use_dictionary=True, dictionary_words=["straße", "groß", "fuß"], **options)
+                for password in policy.generate_many(500):
+                    self.assertEqual(len(password), 10)
+
+
+class PassphraseSamplerTest(unittest.TestCase):
+    """The words picked must fill the budget exactly, and 'combinations' must count every possible pick."""
+
+    WORDS_BY_LENGTH = {2: ["ab", "cd"], 3: ["xyz"], 5: ["hello"]}
+
+    def all_combinations(self, total, max_words):
+        words = [word for bucket in self.WORDS_BY_LENGTH.values() for word in bucket]
+        return {combination for n in range(1, max_words + 1) for combination in itertools.product(words, repeat=n)
+                if sum(map(len, combination)) == total}
+
+    def test_exact_length_and_count(self):
+        sampler = PassphraseSampler(self.WORDS_BY_LENGTH, 7, max_words=3)
+        expected = self.all_combinations(7, 3)
+        self.assertEqual(sampler.target, 7)
+        self.assertEqual(sampler.combinations, len(expected))
+        seen = {tuple(sampler.sample()) for _ in range(2000)}
+        self.assertEqual(seen, expected) # Every pick is valid, and with this many tries each one shows up.
+
+    def test_unreachable_budget(self):
+        sampler = PassphraseSampler({4: ["word"]}, 7, max_words=3)
+        self.assertEqual(sampler.target, 4) # The longest total that can be reached.
+        self.assertEqual(sampler.sample(), ["word"])
+
+
+class UniqueFilterTest(unittest.TestCase):
+    def test_repeats_are_rejected(self):
+        unique = UniqueFilter(1000)
+        self.assertTrue(unique.add("correct horse"))
+        self.assertTrue(unique.add("battery staple"))
+        self.assertFalse(unique.add("correct horse"))
+        self.assertEqual(unique.collisions, 1)
+
+    def test_generate_never_repeats(self):
+        digits = PasswordPolicy(1, use_lowercase=False, use_uppercase=False, use_symbols=False) # Only 10 possible passwords.
+        self.assertEqual(sorted(UniqueFilter(1000).generate(digits, 10)), list("0123456789"))
+        with self.assertRaises(ValueError): # An 11th different password doesn't exist.
+            list(UniqueFilter(1000).generate(digits, 11))
+
+
+class StrengthCheckerTest(unittest.TestCase):
+    """The words found must be the ones really in the password, even after letters that grow when lowered."""
+
+    def test_words_after_dotted_capital_i(self):
+        checker = StrengthChecker(["horse", "battery", "istanbul"])
+        # 'İ'.lower() is two characters: lowering the whole text would shift every word after it.
+        _, _, _, words = checker.check("İİİhorse1battery")
+        self.assertEqual(words, ["horse", "battery"])
+        _, _, _, words = checker.check("Istanbul")
+        self.assertEqual(words, ["istanbul"])
+
+
+if __name__ == "__main__":
+    unittest.main()
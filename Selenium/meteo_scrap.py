@@ -1,5 +1,9 @@
+import argparse # Modulo per leggere le opzioni dalla riga di comando (es. il numero di browser)
 import csv # Modulo per leggere e scrivere file CSV
-import time # Modulo per introdurre pause nel codice (utili nello scraping web)
+import queue # Coda condivisa da cui i browser in parallelo prendono le città da elaborare
+import threading # Permette di far lavorare più browser contemporaneamente
+import time # Modulo per misurare quanto durano le varie fasi dello scraping
+from contextlib import contextmanager # Permette di misurare una fase con un semplice blocco "with"
 from datetime import datetime # Modulo per lavorare con date e orari
 from selenium import webdriver # Il modulo principale di Selenium per interagire con i browser
 from selenium.webdriver.common.by import By # Usato per specificare come trovare gli elementi (es. per ID, per classe, per XPath)
@@ -23,17 +27,75 @@ CITIES = [
     "Londra, Regno Unito", "Seul, Corea del Sud"
 ]
 
-def setup_driver():
+# --- Attese basate su condizioni ---
+# Invece di pause fisse (time.sleep), lo script aspetta solo ciò che serve davvero: il cambio di pagina dopo
+# la ricerca e la comparsa della temperatura, l'unico campo obbligatorio. Appena la condizione è vera si prosegue.
+# Gli altri campi (es. l'indice UV, che di notte può mancare) vengono letti subito dopo: se non ci sono,
+# risultano "N/A" senza nessuna attesa in più.
+# Ogni quanti secondi WebDriverWait ricontrolla una condizione (il valore predefinito di Selenium è 0.5).
+POLL_FREQUENCY = 0.1
+# Tempo massimo (in secondi) per il cambio di pagina dopo la ricerca, al posto delle vecchie pause fisse.
+NAVIGATION_TIMEOUT = 3
+
+# --- Mappa dei selettori ---
+# Per ogni colonna del CSV, i selettori CSS dell'elemento che contiene il dato, in ordine di preferenza:
+# se il primo non trova niente (o trova un elemento vuoto) si prova il successivo.
+# I selettori di riserva cercano solo una parte del nome di classe/ID, così funzionano anche se MSN cambia
+# il suffisso generato automaticamente (es. "-DS-EntryPoint1-1"). Se il sito cambia, basta modificare questa mappa.
+FIELD_SELECTORS = {
+    "Temperatura_Attuale": [
+        ".u1SummaryTemperatureCompact-DS-EntryPoint1-1",
+        "[class*='SummaryTemperatureCompact']",
+        "[class*='summaryTemperature']",
+    ],
+    "Condizione_Attuale": [
+        ".u1SummaryCaptionCompact-DS-EntryPoint1-1",
+        "[class*='SummaryCaptionCompact']",
+        "[class*='summaryCaption']",
+    ],
+    "UV_Index_Attuale": [
+        "#CurrentDetailLineUVIndexValue",
+        "[id*='UVIndexValue']",
+    ],
+}
+# Questo script JavaScript legge tutti i campi in un'unica chiamata al browser (execute_script), invece di una
+# find_element per campo: un campo mancante costa pochi millisecondi invece dei 10 secondi dell'attesa implicita.
+# Per ogni campo restituisce il testo e il selettore che l'ha trovato, oppure null.
+EXTRACTION_SCRIPT = """
+var fields = arguments[0];
+var result = {};
+for (var name in fields) {
+    result[name] = null;
+    var selectors = fields[name];
+    for (var i = 0; i < selectors.length; i++) {
+        var element = document.querySelector(selectors[i]);
+        var text = element ? (element.innerText || element.textContent || '').trim() : '';
+        if (text) {
+            result[name] = {text: text, selector: selectors[i]};
+            break;
+        }
+    }
+}
+return result;
+"""
+
+# Quante volte una città viene provata in tutto prima di segnarla come "Errore".
+# Dopo ogni tentativo fallito il browser del worker viene chiuso e riavviato, nel caso fosse bloccato.
+TENTATIVI_PER_CITTA = 2
+
+def setup_driver(headless: bool = False, driver_path: str | None = None):
     """
     Configura e restituisce un'istanza del WebDriver di Firefox.
     Utilizza GeckoDriverManager per gestire automaticamente il geckodriver,
     il che significa che non devi scaricarlo o specificare il suo percorso manualmente.
+    Con headless=True il browser viene avviato senza finestra (usato quando ne lavorano più insieme).
+    Se driver_path è indicato, si usa quel geckodriver già scaricato invece di chiamare di nuovo GeckoDriverManager.
     """
     firefox_options = FirefoxOptions() # Crea un oggetto per configurare le opzioni di Firefox
     
-    # Puoi scommentare la riga seguente per eseguire Firefox in modalità headless (senza interfaccia grafica)
-    # Questa modalità è utile per l'esecuzione su server o per rendere lo scraping più veloce
-    # firefox_options.add_argument("--headless")
+    # Modalità headless (senza interfaccia grafica): utile per l'esecuzione su server o per rendere lo scraping più veloce
+    if headless:
+        firefox_options.add_argument("--headless")
     
     # Per la modalità headless su sistemi Linux
     # firefox_options.add_argument("--no-sandbox")
@@ -41,7 +103,7 @@ def setup_driver():
 
     # Inizializza il servizio di Firefox usando GeckoDriverManager
     # Questo metodo scarica e configura il geckodriver (il bridge tra Selenium e Firefox)
-    service = FirefoxService(GeckoDriverManager().install())
+    service = FirefoxService(driver_path or GeckoDriverManager().install())
 
     print("Avvio del browser Firefox...")
     # Inizializza il WebDriver di Firefox con il servizio e le opzioni definite
@@ -50,6 +112,54 @@ def setup_driver():
     driver.implicitly_wait(10)
     return driver
 
+class PhaseTimer:
+    """
+    Misura quanto tempo richiede ogni fase dell'estrazione di una città (caricamento, cookie, ricerca, ...),
+    per vedere dove se ne va il tempo. Si usa così:  with timer.phase("ricerca"): ...
+    """
+    def __init__(self):
+        self.durations = {} # nome della fase -> secondi
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0) + time.perf_counter() - start
+
+    def summary(self) -> str:
+        """I tempi in una riga, es. 'pagina 1.2s, cookie 0.3s'."""
+        return ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.durations.items())
+
+# Tempi totali di ogni fase su tutte le città (sommati anche tra i worker in parallelo), mostrati alla fine da main()
+PHASE_TOTALS = {}
+phase_totals_lock = threading.Lock()
+
+def record_timings(timer: PhaseTimer):
+    """Aggiunge i tempi di una città a PHASE_TOTALS."""
+    with phase_totals_lock:
+        for name, seconds in timer.durations.items():
+            PHASE_TOTALS[name] = PHASE_TOTALS.get(name, 0) + seconds
+
+def extract_fields(driver: webdriver.Firefox, city: str, selectors: dict = FIELD_SELECTORS) -> dict:
+    """
+    Estrae tutti i campi della mappa dei selettori con un solo execute_script (vedi EXTRACTION_SCRIPT).
+    Restituisce un dizionario colonna -> testo, con "N/A" per i campi non trovati.
+    """
+    found = driver.execute_script(EXTRACTION_SCRIPT, selectors)
+    data = {}
+    for name, field_selectors in selectors.items():
+        value = found.get(name)
+        if value:
+            data[name] = value["text"]
+            note = "" if value["selector"] == field_selectors[0] else f" (selettore di riserva {value['selector']})"
+            print(f"    {name} trovato: {value['text']}{note}")
+        else:
+            data[name] = "N/A"
+            print(f"    {name} non trovato per {city}.")
+    return data
+
 def handle_cookie_consent(driver: webdriver.Firefox):
     """
     Tenta di gestire il consenso ai cookie su MSN Meteo.
@@ -83,95 +193,89 @@ def handle_cookie_consent(driver: webdriver.Firefox):
     except Exception as e:
         # Cattura qualsiasi altro errore inaspettato
         print(f"Errore generico durante la gestione dei cookie: {e}")
-    time.sleep(2) # Piccola pausa per lasciare che l'interfaccia utente si assesti dopo l'interazione con i cookie
+    # Invece di una pausa fissa, aspetta che il banner dei cookie sia sparito (o che non ci sia mai stato).
+    # Il controllo è fatto in JavaScript per non subire l'attesa implicita di 10 secondi quando l'elemento non esiste.
+    try:
+        WebDriverWait(driver, 5, poll_frequency=POLL_FREQUENCY).until(lambda d: d.execute_script(
+            "var banner = document.getElementById('onetrust-banner-sdk');"
+            "return !banner || banner.offsetParent === null;"
+        ))
+    except TimeoutException:
+        print("Il banner dei cookie è ancora visibile, proseguo comunque.")
 
 def get_weather_data(driver: webdriver.Firefox, city: str) -> dict | None:
     """
     Naviga su MSN Meteo, cerca la città e tenta di estrarre i dati meteo desiderati.
     Restituisce un dizionario con i dati o None in caso di errore.
+    Alla fine mostra quanto è durata ogni fase (vedi PhaseTimer) e la aggiunge ai totali in PHASE_TOTALS.
     """
     print(f"  Ricerca dati meteo per: {city}")
+    timer = PhaseTimer()
     try:
         # Apre la pagina di MSN Meteo
-        driver.get("https://www.msn.com/it-it/meteo")
+        with timer.phase("pagina"):
+            driver.get("https://www.msn.com/it-it/meteo")
         
         # Gestione dei cookie subito dopo il caricamento della pagina per ogni città.
         # È importante gestirli qui perché potrebbero riapparire o essere specifici per sessione/pagina.
-        handle_cookie_consent(driver) 
+        with timer.phase("cookie"):
+            handle_cookie_consent(driver) 
 
-        # Attendi che la casella di ricerca sia cliccabile.
-        # Usiamo un selettore CSS che è più robusto, cercando sia per classe che per placeholder testuale.
-        search_box = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "input.querybox-searchBox, input[placeholder*='Cerca località']"))
-        )
-        search_box.clear() # Pulisce qualsiasi testo preesistente nella casella di ricerca
-        search_box.send_keys(city) # Digita il nome della città nella casella di ricerca
+        with timer.phase("ricerca"):
+            start_url = driver.current_url # Per riconoscere quando si arriva alla pagina della città
+            # Attendi che la casella di ricerca sia cliccabile.
+            # Usiamo un selettore CSS che è più robusto, cercando sia per classe che per placeholder testuale.
+            search_box = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "input.querybox-searchBox, input[placeholder*='Cerca località']"))
+            )
+            search_box.clear() # Pulisce qualsiasi testo preesistente nella casella di ricerca
+            search_box.send_keys(city) # Digita il nome della città nella casella di ricerca
         
        
-        # Estrai solo il nome della città (es. "Roma" da "Roma, Italia")
-        city_name_only = city.split(',')[0].strip() 
+            # Estrai solo il nome della città (es. "Roma" da "Roma, Italia")
+            city_name_only = city.split(',')[0].strip() 
         
-        try:
-            # Attendi che il contenitore dei suggerimenti appaia dopo aver digitato la città
-            WebDriverWait(driver, 5).until( # Breve attesa per la comparsa del box suggerimenti
-                EC.presence_of_element_located((By.CSS_SELECTOR, "ul[role='listbox']"))
-            )
-            # Attendi che il primo suggerimento all'interno del listbox sia cliccabile.
-            # Usiamo un XPath per trovare un bottone all'interno della lista che contenga il nome della città.
-            first_suggestion = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, f"//ul[@role='listbox']//button[contains(., '{city_name_only}')]"))  
-            )
-            first_suggestion.click() # Clicca sul suggerimento
-            print(f"    Selezionato il suggerimento per {city}.")
-            time.sleep(3) # Pausa più lunga dopo il click sul suggerimento per dare tempo alla pagina di caricarsi
-        except TimeoutException:
-            # Se nessun suggerimento specifico viene trovato, prova a premere INVIO come fallback
-            print(f"    Nessun suggerimento specifico trovato o cliccabile per {city_name_only} dopo aver digitato. Tentativo con ENTER.")
-            search_box.send_keys(Keys.ENTER) # Simula la pressione del tasto INVIO
-            time.sleep(5) # Pausa più lunga dopo INVIO, poiché potrebbe portare a una pagina di ricerca generica o a un caricamento più lungo
-        # 
-
+            try:
+                # Attendi che il contenitore dei suggerimenti appaia dopo aver digitato la città
+                WebDriverWait(driver, 5).until( # Breve attesa per la comparsa del box suggerimenti
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "ul[role='listbox']"))
+                )
+                # Attendi che il primo suggerimento all'interno del listbox sia cliccabile.
+                # Usiamo un XPath per trovare un bottone all'interno della lista che contenga il nome della città.
+                first_suggestion = WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable((By.XPATH, f"//ul[@role='listbox']//button[contains(., '{city_name_only}')]"))  
+                )
+                first_suggestion.click() # Clicca sul suggerimento
+                print(f"    Selezionato il suggerimento per {city}.")
+            except TimeoutException:
+                # Se nessun suggerimento specifico viene trovato, prova a premere INVIO come fallback
+                print(f"    Nessun suggerimento specifico trovato o cliccabile per {city_name_only} dopo aver digitato. Tentativo con ENTER.")
+                search_box.send_keys(Keys.ENTER) # Simula la pressione del tasto INVIO
+            # Anche la pagina di partenza può mostrare una temperatura (quella della posizione rilevata),
+            # quindi prima si aspetta di aver lasciato la pagina iniziale, invece di una pausa fissa.
+            try:
+                WebDriverWait(driver, NAVIGATION_TIMEOUT, poll_frequency=POLL_FREQUENCY).until(EC.url_changes(start_url))
+            except TimeoutException:
+                print(f"    L'indirizzo della pagina non è cambiato dopo la ricerca di {city}, proseguo comunque.")
 
         # Attendi che l'elemento della temperatura attuale sia VISIBILE
         # Questo è l'indicatore più affidabile che la pagina specifica della città è caricata con i dati.
         print(f"    Attesa del caricamento dei dati meteo per {city}...")
-        WebDriverWait(driver, 25).until( # Aumentato il timeout per il caricamento dei dati, specialmente su connessioni lente
-            EC.visibility_of_element_located((By.CLASS_NAME, "u1SummaryTemperatureCompact-DS-EntryPoint1-1"))
-        )
-        print(f"    Dati meteo per {city} caricati correttamente.")
-        time.sleep(3) # Pausa aggiuntiva per garantire il caricamento completo di tutto il contenuto dinamico della pagina
-
-        # Inizializza un dizionario per i dati meteo della città corrente
-        data = {"Citta": city, "Data_Estrazione": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-        
-        # --- Estrazione Dati Attuali ---
-        try:
-            # Trova l'elemento della temperatura attuale tramite la sua classe CSS e estrae il testo
-            current_temp = driver.find_element(By.CLASS_NAME, "u1SummaryTemperatureCompact-DS-EntryPoint1-1").text.strip()
-            data["Temperatura_Attuale"] = current_temp
-            print(f"    Temperatura attuale trovata: {current_temp}")
-        except NoSuchElementException:
-            # Se l'elemento non viene trovato, imposta il valore su "N/A"
-            data["Temperatura_Attuale"] = "N/A"
-            print(f"    Temperatura attuale non trovata per {city}.")
+        with timer.phase("dati"):
+            # Va bene uno qualsiasi dei selettori della temperatura (uniti in un'unica lista CSS)
+            WebDriverWait(driver, 25, poll_frequency=POLL_FREQUENCY).until( # Aumentato il timeout per il caricamento dei dati, specialmente su connessioni lente
+                EC.visibility_of_element_located((By.CSS_SELECTOR, ", ".join(FIELD_SELECTORS["Temperatura_Attuale"])))
+            )
+            print(f"    Dati meteo per {city} caricati correttamente.")
+            # Nessun'altra attesa: i campi facoltativi che mancano vengono segnati come "N/A" da extract_fields().
 
-        try:
-            # Trova l'elemento della condizione attuale (es. "Soleggiato", "Parzialmente nuvoloso")
-            current_condition = driver.find_element(By.CLASS_NAME, "u1SummaryCaptionCompact-DS-EntryPoint1-1").text.strip()
-            data["Condizione_Attuale"] = current_condition
-            print(f"    Condizione attuale trovata: {current_condition}")
-        except NoSuchElementException:
-            data["Condizione_Attuale"] = "N/A"
-            print(f"    Condizione attuale non trovata per {city}.")
+        with timer.phase("estrazione"):
+            # Inizializza un dizionario per i dati meteo della città corrente
+            data = {"Citta": city, "Data_Estrazione": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
         
-        try:
-            # Trova l'elemento dell'indice UV attuale tramite il suo ID
-            uv_element = driver.find_element(By.ID, "CurrentDetailLineUVIndexValue")
-            data["UV_Index_Attuale"] = uv_element.text.strip()
-            print(f"    Indice UV attuale trovato: {data['UV_Index_Attuale']}")
-        except NoSuchElementException:
-            data["UV_Index_Attuale"] = "N/A"
-            print(f"    Indice UV attuale non trovato o non nel formato atteso per {city}.")
+            # --- Estrazione Dati Attuali ---
+            # Tutti i campi in un colpo solo, dalla mappa FIELD_SELECTORS
+            data.update(extract_fields(driver, city))
 
         print(f"  Dati estratti per {city}.")
         return data
@@ -188,47 +292,133 @@ def get_weather_data(driver: webdriver.Firefox, city: str) -> dict | None:
         # Cattura qualsiasi altro errore inaspettato durante il processo di estrazione
         print(f"  Errore generico durante l'estrazione per {city}: {e}")
         return None
+    finally:
+        # Mostra i tempi di ogni fase, anche se qualcosa è andato storto
+        print(f"  Tempi per {city}: {timer.summary()}")
+        record_timings(timer)
+
+# Intestazione del CSV con solo i dati richiesti
+HEADER = ["Citta", "Data_Estrazione", "Temperatura_Attuale", "Condizione_Attuale", "UV_Index_Attuale"]
+
+def make_row(city: str, data: dict | None) -> list:
+    """
+    Trasforma i dati di una città in una riga del CSV.
+    Si usa data.get(col, "N/A") per assicurarsi che ogni colonna dell'header abbia un valore,
+    anche se un dato specifico non è stato trovato per quella città.
+    Se i dati non sono stati recuperati (es. a causa di un errore), la riga contiene "Errore".
+    """
+    if data:
+        return [data.get(col, "N/A") for col in HEADER]
+    return [city, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "Errore", "Errore", "Errore"]
+
+def worker(worker_id: int, tasks: queue.Queue, results: list, headless: bool, driver_path: str | None):
+    """
+    Il lavoro di un singolo browser nella modalità parallela.
+    Prende una città alla volta dalla coda condivisa finché la coda non è vuota, e scrive il risultato
+    in results alla stessa posizione della città in CITIES, così alla fine l'ordine è quello originale.
+    Un errore resta confinato a questo worker: il suo browser viene chiuso e riavviato, la città riprovata
+    (fino a TENTATIVI_PER_CITTA volte), mentre gli altri worker continuano senza accorgersene.
+    """
+    driver = None
+    try:
+        while True:
+            try:
+                index, city = tasks.get_nowait() # Prende la prossima città libera
+            except queue.Empty:
+                return # Nessuna città rimasta: il worker ha finito
+            data = None
+            for attempt in range(1, TENTATIVI_PER_CITTA + 1):
+                try:
+                    if driver is None:
+                        driver = setup_driver(headless, driver_path)
+                    data = get_weather_data(driver, city)
+                except Exception as e:
+                    # Per esempio il browser non si avvia o si è chiuso all'improvviso
+                    print(f"  [Worker {worker_id}] Errore del browser con {city}: {e}")
+                if data:
+                    break
+                if attempt < TENTATIVI_PER_CITTA:
+                    print(f"  [Worker {worker_id}] Riavvio del browser e nuovo tentativo per {city} ({attempt + 1}/{TENTATIVI_PER_CITTA})...")
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass # Il browser potrebbe essere già chiuso
+                    driver = None
+            results[index] = make_row(city, data)
+    finally:
+        # Assicura che il browser di questo worker venga sempre chiuso
+        if driver is not None:
+            print(f"  [Worker {worker_id}] Chiusura del browser...")
+            driver.quit()
 
 def main():
     """
     Funzione principale per eseguire lo scraping e salvare i dati in un file CSV.
     Orchestra le chiamate alle altre funzioni.
+    Con l'opzione -w/--workers N vengono aperti N browser headless contemporaneamente: ognuno ha il suo driver
+    e prende le città da una coda condivisa, quindi il tempo totale si divide circa per N.
     """
-    driver = None # Inizializza il driver a None, per gestirlo nella clausola finally
-    all_weather_data = [] # Lista per contenere tutti i dati meteo estratti
+    # Legge le opzioni dalla riga di comando
+    parser = argparse.ArgumentParser(
+        description="Estrae i dati meteo delle città in CITIES da MSN Meteo e li salva in un file CSV.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Numero di browser che lavorano contemporaneamente (predefinito: 1). \nCon più di un browser vengono avviati in modalità headless (senza finestra)."
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Avvia il browser senza finestra anche con un solo worker."
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        print("Errore: --workers deve essere almeno 1.")
+        return
+
+    all_weather_data = [HEADER] # Lista per contenere tutti i dati meteo estratti, con l'intestazione come prima riga
     output_filename = "msn_meteo_dati_semplificati.csv" # Nome del file CSV di output
+    results = [None] * len(CITIES) # Una riga per città, nella stessa posizione che ha in CITIES
+    workers = min(args.workers, len(CITIES))
+    start = time.perf_counter()
 
     try:
-        driver = setup_driver() # Inizializza il browser
-
-        # Prepara l'intestazione del CSV con solo i dati richiesti
-        header = ["Citta", "Data_Estrazione", "Temperatura_Attuale", "Condizione_Attuale", "UV_Index_Attuale"]
-        all_weather_data.append(header) # Aggiunge l'intestazione come prima riga della lista dei dati
-
-        for city in CITIES: # Itera su ogni città definita nella lista CITIES
-            data = get_weather_data(driver, city) # Ottiene i dati meteo per la città corrente
-            if data:
-                # Se i dati sono stati recuperati con successo, crea una riga CSV.
-                # Si usa data.get(col, "N/A") per assicurarsi che ogni colonna dell'header abbia un valore,
-                # anche se un dato specifico non è stato trovato per quella città.
-                row = [data.get(col, "N/A") for col in header]
-                all_weather_data.append(row)
-            else:
-                # Se i dati per una città non sono stati recuperati (es. a causa di un errore),
-                # aggiungi una riga con "Errore" per indicare il problema.
-                error_row = [city, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "Errore", "Errore", "Errore"]
-                all_weather_data.append(error_row)
+        # Il geckodriver viene scaricato/trovato una sola volta, prima di avviare i worker,
+        # così i browser in parallelo non provano a scaricarlo tutti insieme.
+        driver_path = GeckoDriverManager().install()
+
+        # La coda condivisa contiene tutte le città, con la loro posizione in CITIES
+        tasks = queue.Queue()
+        for index, city in enumerate(CITIES):
+            tasks.put((index, city))
+
+        if workers == 1:
+            worker(1, tasks, results, args.headless, driver_path) # Un solo browser: nessun thread necessario
+        else:
+            print(f"Avvio di {workers} browser in parallelo...")
+            threads = [
+                threading.Thread(target=worker, args=(n, tasks, results, True, driver_path))
+                for n in range(1, workers + 1)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join() # Attende che tutti i worker abbiano finito
 
     except Exception as e:
         # Cattura qualsiasi errore critico che si verifica nella funzione principale
         print(f"Errore critico nello script principale: {e}")
-    finally:
-        # Questa blocco viene eseguito sempre, sia che ci siano errori o meno.
-        # Assicura che il browser venga chiuso correttamente.
-        if driver: # Controlla se il driver è stato inizializzato
-            print("Chiusura del browser...")
-            driver.quit() # Chiude il browser e termina la sessione del WebDriver
-            print("Browser chiuso.")
+
+    # Unisce i risultati nell'ordine di CITIES; le città rimaste senza risultato (es. nessun browser avviato) sono "Errore"
+    for city, row in zip(CITIES, results):
+        all_weather_data.append(row if row is not None else make_row(city, None))
+    print(f"\n{len(CITIES)} città elaborate in {time.perf_counter() - start:.1f} secondi con {workers} browser.")
+    if PHASE_TOTALS:
+        print("Tempo totale per fase: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in PHASE_TOTALS.items()))
 
     # Scrivi i dati raccolti nel file CSV
     print(f"\nSalvataggio dei dati nel file: {output_filename}...")